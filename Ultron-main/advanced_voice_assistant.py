@@ -1,48 +1,189 @@
-import cv2
-import face_recognition
-import speech_recognition as sr
-import pyttsx3
-import numpy as np
 import os
+import re
+import math
 import json
 import time
-import subprocess
 import webbrowser
-import requests
 from datetime import datetime
 import threading
 import queue
 import platform
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from startup import LazyModule, StartupTimer
+
+# Heavy modules load on first use (or in the background, see preload_modules)
+cv2 = LazyModule("cv2")
+face_recognition = LazyModule("face_recognition")
+sr = LazyModule("speech_recognition")
+pyttsx3 = LazyModule("pyttsx3")
+np = LazyModule("numpy")
+audioop = LazyModule("audioop")
+
+from app_catalog import AppCatalog, is_denied, launch_detached
+from command_matcher import CommandMatcher, alternatives_from_result
+from camera_streams import CameraStream
+from face_detectors import box_iou, create_detector, calibrate_detectors
+from file_indexer import FileIndex
+from identity_store import IdentityStore
+from presence_manager import PresenceManager, MotionDetector, IDLE, PRESENT, SEARCHING
+from resource_governor import ResourceGovernor, limit_library_threads
+from speculative import SPECULATIVE_INTENTS, SpeculativeExecutor, SpeechRenderer
+from web_answers import WebAnswers, first_sentences
+
+# Questions answered from the web, checked before the keyword commands
+QUESTION_PREFIXES = ("who is ", "who was ", "what is ", "what are ", "what was ", "tell me about ")
+# Questions the assistant answers itself, e.g. "what is the time"
+BUILTIN_QUESTIONS = re.compile(r"(the |today's |current )*(time|date|day|system info(rmation)?)( now| today)?$")
+
+def question_subject(command):
+    """What a web question asks about, or None if it is not one"""
+    for prefix in QUESTION_PREFIXES:
+        if command.startswith(prefix):
+            subject = command[len(prefix):].strip()
+            return None if BUILTIN_QUESTIONS.match(subject) else subject
+    return None
 
 class AdvancedVoiceAssistant:
-    def __init__(self):
-        self.recognizer = sr.Recognizer()
-        self.microphone = sr.Microphone()
-        self.engine = pyttsx3.init()
-        self.cap = cv2.VideoCapture(0)
+    def __init__(self, video_sources=None, enable_voice=True, enable_indexing=True):
+        self.startup = StartupTimer()
+        self.enable_voice = enable_voice
+        self._recognizer = None
+        self._microphone = None
+        self._engine = None
         
         # Face recognition variables
-        self.known_face_encodings = []
-        self.known_face_names = []
-        self.face_locations = []
-        self.face_encodings = []
-        self.face_names = []
-        self.process_this_frame = True
+        self.identities = IdentityStore()
+        self.metrics = {}
+        self.metrics_lock = threading.Lock()
+        self.cameras = []
+        self.recognition_pool = None
+        self.pending_recognition = {}
+        self.recognition_ready = threading.Event()
         
         # Voice assistant state
         self.is_listening = False
         self.voice_queue = queue.Queue()
-        self.master_identified = False
+        self.remote_commands = queue.Queue()
         self.conversation_history = []
+        self.running = False
+        self.speech_ended_at = None
+        # Final and early recognition, plus room for an early one still finishing after it lost
+        self.speech_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="speech")
+        self.speech_renderer = None
+        
+        # Load configuration
+        with self.startup.phase("config"):
+            self.load_config()
+        if not enable_indexing:
+            # Benchmarks leave out the file and application crawls, which compete for the CPU
+            self.config["file_operations"] = False
         
-        # Initialize voice settings
-        self.setup_voice()
+        # Debounced master presence
+        self.presence = PresenceManager(
+            required_matches=self.config["presence_required_matches"],
+            window=self.config["presence_window"],
+            session_timeout=self.config["session_timeout"],
+            reverify_interval=self.config["reverify_interval"],
+            idle_after=self.config["idle_after"]
+        )
         
-        # Load known faces
-        self.load_known_faces()
+        # Thread caps must be in place before numpy, cv2 and dlib are imported
+        limit_library_threads(self.config["max_threads"])
+        self.governor = ResourceGovernor(
+            cpu_budget=self.config["cpu_budget"],
+            max_threads=self.config["max_threads"],
+            target_fps=self.config["target_fps"],
+            min_fps=self.config["min_fps"],
+            idle_niceness=self.config["idle_niceness"]
+        )
         
-        # Load configuration
-        self.load_config()
+        # Everything slow happens in the background: cameras open while the face
+        # gallery is encoded, and the main loop shows frames before recognition is ready
+        self.preload_modules()
+        self.startup_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="startup")
+        self.cameras_future = self.startup_pool.submit(self.startup.timed, "cameras", self.setup_cameras, video_sources)
+        self.gallery_future = self.startup_pool.submit(self.startup.timed, "face_gallery", self.load_known_faces)
+        self.recognition_future = self.startup_pool.submit(self.setup_recognition)
+        
+        # Installed applications for the "open" command
+        self.app_catalog = AppCatalog(self.config["app_catalog_path"]).start() if enable_indexing else None
+        
+        # File commands answer from an index kept up to date in the background
+        self.file_index = None
+        if self.config["file_operations"]:
+            self.file_index = FileIndex(
+                self.config["file_index_roots"],
+                index_path=self.config["file_index_path"],
+                poll_interval=self.config["file_index_poll_interval"]
+            ).start()
+            
+        # Picks a command from the other recognition alternatives when the best one is not understood
+        self.command_matcher = CommandMatcher(threshold=self.config["command_match_threshold"])
+        
+        # Spoken answers to questions, fetched over HTTP instead of opening a browser
+        self.web_answers = WebAnswers(
+            self.config["web_answer_endpoints"] or None,
+            timeout=self.config["web_answer_timeout"],
+            cache_path=self.config["web_answer_cache_path"],
+            cache_ttl=self.config["web_answer_cache_ttl"],
+            cache_size=self.config["web_answer_cache_size"]
+        )
+        
+        # Answers to side-effect-free commands are prepared from the start of the utterance
+        self.speculator = SpeculativeExecutor(self.classify_command, self.quick_response,
+                                              render=self.render_speech if enable_voice else None)
+        
+    def preload_modules(self):
+        """Start importing heavy modules on background threads"""
+        modules = [cv2, np, face_recognition]
+        if self.enable_voice:
+            modules += [sr, pyttsx3]
+        for module in modules:
+            module.preload()
+            
+    def setup_recognition(self):
+        """Pick the detector and start the recognition pool once cameras and gallery are up"""
+        self.cameras_future.result()
+        with self.startup.phase("detector"):
+            self.setup_detector()
+            
+        # Shared pool that runs recognition for every camera
+        self.governor.apply_thread_limits()
+        workers = min(self.config["recognition_workers"] or len(self.cameras), self.config["max_threads"])
+        self.recognition_pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="recognition")
+        
+        self.gallery_future.result()
+        # Startup time does not count towards the idle timeout
+        self.presence.on_motion()
+        self.startup.mark("recognition_ready")
+        self.recognition_ready.set()
+        
+    def wait_until_ready(self, timeout=None):
+        """Block until recognition can run, re-raising any startup error"""
+        self.recognition_future.result(timeout)
+        
+    @property
+    def engine(self):
+        """Text-to-speech engine, created on first use on the calling (main) thread"""
+        if self._engine is None:
+            with self.startup.phase("tts_engine"):
+                self._engine = pyttsx3.init()
+                self.setup_voice()
+        return self._engine
+        
+    @property
+    def recognizer(self):
+        if self._recognizer is None:
+            self._recognizer = sr.Recognizer()
+        return self._recognizer
+        
+    @property
+    def microphone(self):
+        if self._microphone is None:
+            with self.startup.phase("microphone"):
+                self._microphone = sr.Microphone()
+        return self._microphone
         
     def setup_voice(self):
         """Setup voice engine properties"""
@@ -66,7 +207,40 @@ class AdvancedVoiceAssistant:
             "master_name": "master",
             "system_commands": True,
             "web_search": True,
-            "file_operations": True
+            "file_operations": True,
+            "face_detector": "auto",
+            "detector_accuracy_floor": 0.8,
+            "full_scan_interval": 10,
+            "roi_margin": 0.6,
+            "roi_max_size": 320,
+            "video_sources": [0],
+            "recognition_workers": 0,
+            "presence_required_matches": 3,
+            "presence_window": 5,
+            "session_timeout": 30,
+            "reverify_interval": 2.0,
+            "idle_after": 15,
+            "motion_threshold": 0.02,
+            "show_window": True,
+            "speech_hold_timeout": 5.0,
+            "daemon_socket": "",
+            "file_index_roots": ["~"],
+            "file_index_path": "file_index.json",
+            "file_index_poll_interval": 300,
+            "app_catalog_path": "app_catalog.json",
+            "cpu_budget": 1.0,
+            "max_threads": 2,
+            "target_fps": 15,
+            "min_fps": 2,
+            "idle_niceness": 10,
+            "speculative_execution": True,
+            "speculative_after": 1.0,
+            "command_match_threshold": 0.8,
+            "web_answer_endpoints": [],
+            "web_answer_timeout": 3.0,
+            "web_answer_cache_path": "web_answer_cache.json",
+            "web_answer_cache_ttl": 86400,
+            "web_answer_cache_size": 500
         }
         
         config_file = "assistant_config.json"
@@ -78,9 +252,92 @@ class AdvancedVoiceAssistant:
                 pass
                 
         # Save default config
-        with open(config_file, 'w') as f:
+        self.save_config()
+        
+    def save_config(self):
+        """Save configuration file"""
+        with open("assistant_config.json", 'w') as f:
             json.dump(self.config, f, indent=2)
             
+    def setup_cameras(self, video_sources=None):
+        """Open every configured video source on its own capture thread"""
+        sources = video_sources if video_sources is not None else self.config["video_sources"]
+        cameras_lock = threading.Lock()
+        
+        def open_camera(camera_id, source):
+            camera = CameraStream(source, camera_id)
+            camera.motion_detector = MotionDetector(threshold=self.config["motion_threshold"])
+            if not camera.is_opened():
+                print(f"Could not open video source {source}")
+                return
+            # Publish each camera as soon as it opens so its frames show right away. The list is
+            # replaced rather than changed in place, so readers never see it half sorted
+            camera.start()
+            with cameras_lock:
+                self.cameras = sorted(self.cameras + [camera], key=lambda c: c.camera_id)
+            
+        # Opening a device can take hundreds of milliseconds, open them all at once
+        threads = [threading.Thread(target=open_camera, args=(camera_id, source), daemon=True)
+                   for camera_id, source in enumerate(sources)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+                
+    def setup_detector(self, calibration_frames=8):
+        """Create the face detector, calibrating on live frames when set to auto"""
+        name = self.config.get("face_detector", "auto")
+        if name == "auto":
+            frames = []
+            if self.cameras:
+                camera = self.cameras[0]
+                camera.wait_for_frame()
+                last_id = 0
+                deadline = time.time() + 5
+                while len(frames) < calibration_frames and camera.running and time.time() < deadline:
+                    frame_id, frame = camera.read()
+                    if frame is not None and frame_id != last_id:
+                        last_id = frame_id
+                        small_frame = cv2.resize(frame, (0, 0), fx=0.25, fy=0.25)
+                        frames.append(np.ascontiguousarray(small_frame[:, :, ::-1]))
+                    else:
+                        time.sleep(0.01)
+                    
+            print("Calibrating face detectors...")
+            name, results = calibrate_detectors(frames, self.config["detector_accuracy_floor"])
+            for backend, result in results.items():
+                print(f"  {backend}: {result['ms_per_frame']} ms/frame, recall {result['recall']}")
+            self.metrics["detector_calibration"] = results
+            if name is None:
+                # Keep "auto" so the next start calibrates again, hopefully with a face in view
+                name = "hog"
+                print(f"No face seen during calibration, using {name} for now")
+            else:
+                print(f"Selected face detector: {name}")
+                # Persist the choice so later runs skip calibration
+                self.config["face_detector"] = name
+                self.save_config()
+            
+        # Each camera gets its own detector instance, OpenCV nets are not thread safe
+        for camera in self.cameras:
+            try:
+                camera.detector = create_detector(name)
+            except Exception as e:
+                print(f"Could not load face detector '{name}': {e}. Falling back to hog.")
+                name = "hog"
+                camera.detector = create_detector(name)
+        self.metrics["detector"] = name
+        
+    @property
+    def master_identified(self):
+        """True while a presence session for the master is active"""
+        return self.presence.is_present
+        
+    def count(self, key, amount=1):
+        """Add to a metrics counter, safe to call from recognition workers"""
+        with self.metrics_lock:
+            self.metrics[key] = self.metrics.get(key, 0) + amount
+            
     def load_known_faces(self):
         """Load known faces from the faces directory"""
         faces_dir = "faces"
@@ -96,76 +353,184 @@ class AdvancedVoiceAssistant:
                 encoding = face_recognition.face_encodings(image)
                 
                 if encoding:
-                    self.known_face_encodings.append(encoding[0])
                     name = os.path.splitext(filename)[0]
-                    self.known_face_names.append(name)
+                    self.identities.add(name, encoding[0])
                     print(f"Loaded face: {name}")
                     
     def speak(self, text):
         """Convert text to speech"""
         print(f"Assistant: {text}")
         self.conversation_history.append({"role": "assistant", "text": text, "timestamp": datetime.now()})
-        self.engine.say(text)
-        self.engine.runAndWait()
+        self.record_response_latency("response_latency_ms")
+        if self.enable_voice:
+            self.engine.say(text)
+            self.engine.runAndWait()
+            
+    def speak_prepared(self, prepared):
+        """Speak a response prepared while Master was still talking"""
+        print(f"Assistant: {prepared.text}")
+        self.conversation_history.append({"role": "assistant", "text": prepared.text, "timestamp": datetime.now()})
+        self.record_response_latency("speculative_response_latency_ms")
+        if not self.enable_voice:
+            return
+        if prepared.audio_path is None or not self.speech_renderer.play(prepared.audio_path):
+            self.engine.say(prepared.text)
+            self.engine.runAndWait()
+            
+    def render_speech(self, text):
+        """Render text to an audio file for later playback, None if no player is available"""
+        if self.speech_renderer is None:
+            self.speech_renderer = SpeechRenderer(self.engine)
+        if not self.speech_renderer.available:
+            return None
+        return self.speech_renderer.render(text)
+        
+    def record_response_latency(self, key):
+        """Time from the end of Master's speech to the start of the first response"""
+        if self.speech_ended_at is None:
+            return
+        latency = (time.perf_counter() - self.speech_ended_at) * 1000
+        self.speech_ended_at = None
+        with self.metrics_lock:
+            average = self.metrics.get(key, latency)
+            self.metrics[key] = round(0.8 * average + 0.2 * latency, 1)
+            
+    def capture_utterance(self, source, timeout=5, phrase_time_limit=10):
+        """Record one phrase the way Recognizer.listen does, but in chunks.
+        
+        Once Master has been speaking for speculative_after seconds, the audio so
+        far is sent for recognition while recording goes on, so the early
+        transcript is usually back by the time they stop talking. Returns the
+        whole phrase and the Future of that early recognition, or None.
+        """
+        recognizer = self.recognizer
+        seconds_per_buffer = source.CHUNK / source.SAMPLE_RATE
+        pause_buffers = int(math.ceil(recognizer.pause_threshold / seconds_per_buffer))
+        preroll_buffers = int(math.ceil(recognizer.non_speaking_duration / seconds_per_buffer))
+        speculate_buffers = int(math.ceil(self.config["speculative_after"] / seconds_per_buffer))
+        
+        def loud(buffer):
+            return audioop.rms(buffer, source.SAMPLE_WIDTH) > recognizer.energy_threshold
+            
+        # Wait for speech to start, keeping a little audio from just before it
+        frames = []
+        waited = 0.0
+        while True:
+            buffer = source.stream.read(source.CHUNK)
+            if not buffer:
+                break
+            frames = (frames + [buffer])[-preroll_buffers - 1:]
+            if loud(buffer):
+                break
+            waited += seconds_per_buffer
+            if timeout and waited > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+                
+        partial = None
+        spoken = pause = 0
+        while True:
+            buffer = source.stream.read(source.CHUNK)
+            if not buffer:
+                break
+            frames.append(buffer)
+            spoken += 1
+            pause = 0 if loud(buffer) else pause + 1
+            if pause > pause_buffers or (phrase_time_limit and spoken * seconds_per_buffer > phrase_time_limit):
+                break
+            # Only while Master is still talking, a phrase that is ending gains nothing
+            if partial is None and self.config["speculative_execution"] and spoken >= speculate_buffers and pause == 0:
+                prefix = sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
+                partial = self.speech_pool.submit(recognizer.recognize_google, prefix)
+                
+        # Like Recognizer.listen, drop the trailing silence
+        frames = frames[:len(frames) - max(0, pause - preroll_buffers)]
+        return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH), partial
+        
+    def recognize_speech(self, audio, partial=None):
+        """Transcribe audio into all recognition alternatives, best first.
+        
+        partial is the early recognition from capture_utterance. If it is back
+        before the final result, its transcript is used to prepare the answer.
+        """
+        final = self.speech_pool.submit(self.recognize_alternatives, audio)
+        if partial is None:
+            return final.result()
+            
+        wait([final, partial], return_when=FIRST_COMPLETED)
+        if final.done():
+            # Too late to help, do not let it hold a worker if it has not started
+            partial.cancel()
+        elif partial.exception() is None:
+            self.speculator.on_partial(partial.result().lower())
+        try:
+            return final.result()
+        except Exception:
+            self.speculator.discard()
+            raise
+            
+    def recognize_alternatives(self, audio):
+        alternatives = alternatives_from_result(self.recognizer.recognize_google(audio, show_all=True))
+        if not alternatives:
+            raise sr.UnknownValueError()
+        return alternatives
         
     def listen_for_command(self):
-        """Listen for voice commands"""
+        """Listen for a voice command, returns (command, intent) or None.
+        
+        intent is set when the command was picked from the lower-ranked
+        recognition alternatives, None means classify it as usual.
+        """
         try:
             with self.microphone as source:
                 self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
                 print("Listening for command...")
-                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=10)
+                audio, partial = self.capture_utterance(source, timeout=5, phrase_time_limit=10)
                 
-            command = self.recognizer.recognize_google(audio).lower()
-            print(f"Master said: {command}")
+            self.speech_ended_at = time.perf_counter()
+            alternatives = self.recognize_speech(audio, partial)
+            command, intent = self.command_matcher.choose(alternatives, self.classify_command)
+            if intent is not None:
+                print(f"Master said: {command} (alternative to '{alternatives[0]}')")
+                self.count("nbest_matches")
+            else:
+                print(f"Master said: {command}")
             self.conversation_history.append({"role": "master", "text": command, "timestamp": datetime.now()})
-            return command
+            return command, intent
             
         except sr.WaitTimeoutError:
             return None
         except sr.UnknownValueError:
             print("Could not understand audio")
+            self.speech_ended_at = None
             return None
         except sr.RequestError as e:
             print(f"Could not request results; {e}")
+            self.speech_ended_at = None
             return None
             
-    def identify_face(self, frame):
-        """Identify faces in the frame"""
-        small_frame = cv2.resize(frame, (0, 0), fx=0.25, fy=0.25)
-        rgb_small_frame = small_frame[:, :, ::-1]
-        
-        if self.process_this_frame:
-            self.face_locations = face_recognition.face_locations(rgb_small_frame)
-            self.face_encodings = face_recognition.face_encodings(rgb_small_frame, self.face_locations)
+    def identify_face(self, frame, camera):
+        """Identify faces in a frame from the given camera"""
+        # Frames are only skipped while searching, presence re-checks are already sparse
+        if camera.process_this_frame or self.presence.state != SEARCHING:
+            faces = None
             
-            self.face_names = []
-            for face_encoding in self.face_encodings:
-                matches = face_recognition.compare_faces(self.known_face_encodings, face_encoding, tolerance=0.6)
-                name = "Unknown"
+            # Search around known faces first, with a periodic full-frame rescan
+            if camera.face_locations and camera.frames_since_full_scan < self.config["full_scan_interval"]:
+                faces = self.scan_regions(frame, camera)
                 
-                if True in matches:
-                    first_match_index = matches.index(True)
-                    name = self.known_face_names[first_match_index]
-                    
-                    # Check if master is identified
-                    if name.lower() in [self.config["master_name"], "owner", "user"]:
-                        self.master_identified = True
-                        if not hasattr(self, 'master_greeted'):
-                            self.speak("Welcome Master! I am at your service.")
-                            self.master_greeted = True
+            if faces is None:
+                faces = self.scan_full_frame(frame, camera)
                 
-                self.face_names.append(name)
+            if faces is not None:
+                camera.face_locations = [location for location, _ in faces]
+                camera.face_names = [name for _, name in faces]
+                self.update_presence(camera)
+            camera.processed_frames += 1
                 
-        self.process_this_frame = not self.process_this_frame
+        camera.process_this_frame = not camera.process_this_frame
         
         # Draw results on frame
-        for (top, right, bottom, left), name in zip(self.face_locations, self.face_names):
-            top *= 4
-            right *= 4
-            bottom *= 4
-            left *= 4
-            
+        for (top, right, bottom, left), name in zip(camera.face_locations, camera.face_names):
             # Color based on recognition
             color = (0, 255, 0) if name != "Unknown" else (0, 0, 255)
             
@@ -176,69 +541,370 @@ class AdvancedVoiceAssistant:
             
         return frame
         
-    def execute_command(self, command):
-        """Execute voice commands"""
-        if not command:
+    def scan_full_frame(self, frame, camera):
+        """Detect faces over the whole downscaled frame.
+        
+        Returns (location, name) pairs in full-resolution coordinates. Live
+        frames are detected one at a time: a batch would only add latency, since
+        just the newest frame is shown and voted on.
+        """
+        small_frame = cv2.resize(frame, (0, 0), fx=0.25, fy=0.25)
+        rgb_small_frame = np.ascontiguousarray(small_frame[:, :, ::-1])
+        locations = camera.detector.detect(rgb_small_frame)
+        names = self.recognize_faces(rgb_small_frame, locations, camera)
+        
+        camera.frames_since_full_scan = 0
+        self.count("full_scans")
+        self.count("pixels_processed", rgb_small_frame.shape[0] * rgb_small_frame.shape[1])
+        
+        return [(tuple(4 * v for v in location), name) for location, name in zip(locations, names)]
+        
+    def scan_regions(self, frame, camera):
+        """Detect faces only inside expanded boxes around the last known faces.
+        
+        Regions are cropped from the full-resolution frame, so distant faces are
+        recognized with more detail than the downscaled full scan gives. Returns
+        None if any region loses its face, so the caller can rescan the frame.
+        """
+        height, width = frame.shape[:2]
+        margin = self.config["roi_margin"]
+        max_side = self.config["roi_max_size"]
+        faces = []
+        pixels = 0
+        
+        for top, right, bottom, left in camera.face_locations:
+            pad_y = int((bottom - top) * margin)
+            pad_x = int((right - left) * margin)
+            y0, y1 = max(0, top - pad_y), min(height, bottom + pad_y)
+            x0, x1 = max(0, left - pad_x), min(width, right + pad_x)
+            if y1 <= y0 or x1 <= x0:
+                return None
+                
+            region = frame[y0:y1, x0:x1]
+            # Shrink large regions (close faces) so they cost no more than max_side allows
+            scale = min(1.0, max_side / float(max(region.shape[:2])))
+            if scale < 1.0:
+                region = cv2.resize(region, (0, 0), fx=scale, fy=scale)
+            rgb_region = np.ascontiguousarray(region[:, :, ::-1])
+            pixels += rgb_region.shape[0] * rgb_region.shape[1]
+            
+            locations = camera.detector.detect(rgb_region)
+            if not locations:
+                self.count("roi_misses")
+                return None
+                
+            names = self.recognize_faces(rgb_region, locations, camera)
+            for (t, r, b, l), name in zip(locations, names):
+                location = (y0 + int(t / scale), x0 + int(r / scale), y0 + int(b / scale), x0 + int(l / scale))
+                # Neighbouring regions can overlap and see the same face
+                if not any(box_iou(location, other) > 0.5 for other, _ in faces):
+                    faces.append((location, name))
+                    
+        camera.frames_since_full_scan += 1
+        self.count("roi_scans")
+        self.count("pixels_processed", pixels)
+        return faces
+        
+    def recognize_faces(self, rgb_frame, face_locations, camera):
+        """Encode detected faces and match them against the shared identity store"""
+        face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
+        
+        face_names = []
+        for face_encoding in face_encodings:
+            name = self.identities.match(face_encoding)
+            if name != "Unknown":
+                self.identities.observe(name, camera.camera_id)
+            face_names.append(name)
+            
+        return face_names
+        
+    def is_master(self, name):
+        """Whether a recognized name belongs to the master"""
+        return name.lower() in [self.config["master_name"], "owner", "user"]
+        
+    def update_presence(self, camera):
+        """Feed one recognition result from a camera into the presence state machine"""
+        master_seen = any(self.is_master(name) for name in camera.face_names)
+        if self.presence.observe(master_seen, face_seen=bool(camera.face_names),
+                                 camera_id=camera.camera_id) == PRESENT:
+            # Master is recognized on whichever camera confirms them first
+            print(f"Master identified on {camera.name}")
+            self.count("presence_sessions")
+            # Workers never speak directly, the main loop owns the TTS engine
+            self.voice_queue.put("Welcome Master! I am at your service.")
+        
+    def poll_cameras(self):
+        """Hand the newest frame of each camera to the recognition pool.
+        
+        At most one frame per camera is in flight, so slow recognition drops
+        frames instead of queueing them. How much work is done follows the
+        presence state: every frame while searching, a periodic re-check while
+        master is present, and only motion detection while idle. Until startup
+        finishes, frames are passed straight through for display. Returns False
+        once every camera has stopped.
+        """
+        ready = self.recognition_ready.is_set()
+        if not ready and self.recognition_future.done():
+            # Re-raise whatever stopped recognition from starting
+            self.recognition_future.result()
+            
+        now = time.time()
+        if self.presence.update(now) == IDLE:
+            print("Master not seen, standing down to idle mode")
+            self.count("presence_timeouts")
+            for camera in self.cameras:
+                camera.face_locations = []
+                camera.face_names = []
+        self.governor.set_idle(self.presence.state == IDLE)
+                
+        for camera in list(self.cameras):
+            future = self.pending_recognition.get(camera.camera_id)
+            if future is not None and future.done():
+                del self.pending_recognition[camera.camera_id]
+                try:
+                    camera.display_frame = future.result()
+                    # Frame handed over to result ready, including time queued for a worker
+                    latency = (time.time() - camera.submitted_at) * 1000
+                    with self.metrics_lock:
+                        average = self.metrics.get("recognition_latency_ms", latency)
+                        self.metrics["recognition_latency_ms"] = round(0.9 * average + 0.1 * latency, 1)
+                except Exception as e:
+                    print(f"Recognition failed on {camera.name}: {e}")
+                    
+            frame_id, frame = camera.read()
+            if frame is None or frame_id == camera.last_processed_id:
+                continue
+            if camera.camera_id in self.pending_recognition:
+                continue
+            camera.last_processed_id = frame_id
+            
+            if not ready:
+                camera.display_frame = frame
+            elif self.presence.state == IDLE:
+                camera.display_frame = frame
+                if camera.motion_detector.detect(frame) and self.presence.on_motion(now) == SEARCHING:
+                    print(f"Motion on {camera.name}, looking for Master...")
+            elif self.presence.should_recognize(camera.camera_id, now):
+                camera.submitted_at = now
+                self.pending_recognition[camera.camera_id] = self.recognition_pool.submit(self.identify_face, frame.copy(), camera)
+            else:
+                camera.display_frame = frame
+                
+        if not self.cameras_future.done():
             return True
+        return any(camera.running for camera in self.cameras) or bool(self.pending_recognition)
+        
+    def submit_command(self, text):
+        """Queue a text command for the main loop, e.g. from the daemon socket.
+        
+        Returns a Future resolving to {"responses": [...], "continue": bool}.
+        """
+        future = Future()
+        self.remote_commands.put((text, future))
+        return future
+        
+    def process_remote_commands(self):
+        """Run queued text commands. Returns False if one of them asked to exit"""
+        keep_running = True
+        while not self.remote_commands.empty():
+            text, future = self.remote_commands.get()
+            command = text.lower()
+            print(f"Remote command: {command}")
+            first_entry = len(self.conversation_history)
+            self.conversation_history.append({"role": "master", "text": command, "timestamp": datetime.now()})
+            try:
+                keep_running = self.execute_command(command) and keep_running
+            except Exception as e:
+                future.set_exception(e)
+                continue
+            responses = [entry["text"] for entry in self.conversation_history[first_entry:] if entry["role"] == "assistant"]
+            future.set_result({"responses": responses, "continue": keep_running})
+        return keep_running
+        
+    def get_presence(self):
+        """Presence state plus the latest sighting of each known face"""
+        presence = self.presence.snapshot()
+        presence["master_identified"] = self.master_identified
+        with self.identities.lock:
+            presence["sightings"] = dict(self.identities.sightings)
+        return presence
+        
+    def get_metrics(self):
+        """Snapshot of recognition, presence, camera and startup metrics"""
+        with self.metrics_lock:
+            metrics = dict(self.metrics)
+        metrics["presence"] = self.presence.state
+        metrics["recognition_ready"] = self.recognition_ready.is_set()
+        metrics["cameras"] = [
+            {"id": camera.camera_id, "source": camera.source, "running": camera.running,
+             "frames_captured": camera.frame_id, "frames_processed": camera.processed_frames}
+            for camera in list(self.cameras)
+        ]
+        metrics["startup"] = self.startup.as_dict()
+        metrics["governor"] = self.governor.snapshot()
+        if self.app_catalog is not None:
+            metrics["app_catalog"] = dict(self.app_catalog.stats)
+        if self.file_index is not None:
+            metrics["file_index"] = self.file_index.snapshot()
+        metrics["speculation"] = dict(self.speculator.stats)
+        metrics["web_answers"] = self.web_answers.snapshot()
+        return metrics
+        
+    def find_files(self, command):
+        """Answer a spoken file search from the file index"""
+        results = []
+        for path in self.file_index.query(command, limit=10):
+            # A file removed since the query has no modification time any more
+            modified = self.file_index.modified_time(path)
+            if modified is not None:
+                results.append((path, modified))
+        if not results:
+            if self.file_index.ready.is_set():
+                self.speak("Sorry Master, I couldn't find any matching files.")
+            else:
+                self.speak("I'm still indexing your files, Master. Please ask again in a moment.")
+            return
             
-        # Greeting commands
-        if any(word in command for word in ["hello", "hi", "hey"]):
-            self.speak("Hello Master! How can I help you today?")
+        for path, _ in results:
+            print(f"  {path}")
+        spoken = []
+        for path, modified in results[:3]:
+            modified = datetime.fromtimestamp(modified).strftime("%B %d")
+            spoken.append(f"{os.path.basename(path)} in {os.path.basename(os.path.dirname(path))}, modified {modified}")
+        self.speak(f"I found {len(results)} matching files. " + "; ".join(spoken))
+        
+    def answer_question(self, query):
+        """Speak an answer fetched from the web, or open a browser search if there is none"""
+        answer, source = self.web_answers.answer(query)
+        if answer:
+            print(f"(answer from {source})")
+            self.speak(first_sentences(answer))
+        else:
+            search_url = f"https://www.google.com/search?q={query.replace(' ', '+')}"
+            webbrowser.open(search_url)
+            self.speak(f"I couldn't find a short answer, Master. Searching for {query}")
             
-        # Time commands
-        elif "time" in command:
+    @staticmethod
+    def classify_command(command):
+        """Map a transcript to the name of the command that handles it"""
+        # File search is checked first since "find this" would otherwise read as a greeting
+        if command.startswith(("find ", "locate ", "where is ", "where are ")):
+            return "file_search"
+        # Questions are anchored at the start, "what is history" is not a greeting
+        if question_subject(command):
+            return "question"
+        if any(word in command for word in ["hello", "hi", "hey"]):
+            return "greeting"
+        if "time" in command:
+            return "time"
+        if "date" in command:
+            return "date"
+        if "system info" in command or "system information" in command:
+            return "system_info"
+        if "list files" in command or "show files" in command:
+            return "list_files"
+        if "search for" in command or "google" in command:
+            return "web_search"
+        if "open" in command:
+            return "open_app"
+        if "shutdown" in command or "turn off" in command:
+            return "shutdown"
+        if "restart" in command:
+            return "restart"
+        if "help" in command or "what can you do" in command:
+            return "help"
+        if any(word in command for word in ["exit", "quit", "stop", "goodbye"]):
+            return "exit"
+        return "unknown"
+        
+    def quick_response(self, intent):
+        """Response text for commands that only answer and change nothing"""
+        if intent == "greeting":
+            return "Hello Master! How can I help you today?"
+        if intent == "time":
             current_time = datetime.now().strftime("%I:%M %p")
-            self.speak(f"The current time is {current_time}")
-            
-        # Date commands
-        elif "date" in command:
+            return f"The current time is {current_time}"
+        if intent == "date":
             current_date = datetime.now().strftime("%B %d, %Y")
-            self.speak(f"Today is {current_date}")
+            return f"Today is {current_date}"
+        if intent == "system_info":
+            return f"I'm running on {platform.system()} {platform.release()}"
+        if intent == "help":
+            return "I can help you with: telling time and date, system information, listing files, web searches, opening applications, and system control. Just ask me what you need, Master."
+        raise ValueError(f"{intent} has no quick response")
+        
+    def execute_command(self, command, intent=None):
+        """Execute voice commands, intent skips classifying the command"""
+        if not command:
+            return True
             
-        # System information
-        elif "system info" in command or "system information" in command:
-            system_info = f"I'm running on {platform.system()} {platform.release()}"
-            self.speak(system_info)
+        intent = intent or self.classify_command(command)
+        # Confirms or throws away whatever was prepared from the start of the utterance
+        prepared = self.speculator.commit(command)
+        
+        # File search
+        if intent == "file_search":
+            if self.config["file_operations"]:
+                self.find_files(command)
+            else:
+                self.speak("File operations are disabled in configuration.")
+                
+        # Greeting, time, date, system information and help, possibly prepared while Master was speaking
+        elif intent in SPECULATIVE_INTENTS:
+            if prepared is not None:
+                self.speak_prepared(prepared)
+            else:
+                self.speak(self.quick_response(intent))
             
         # File operations
-        elif "list files" in command or "show files" in command:
+        elif intent == "list_files":
             if self.config["file_operations"]:
-                files = os.listdir(".")
+                files = self.file_index.list_directory(os.getcwd())
+                if files is None:
+                    # Working directory is outside the indexed roots
+                    files = sorted(os.listdir("."), key=str.lower)
                 file_list = ", ".join(files[:10])  # Show first 10 files
                 self.speak(f"Files in current directory: {file_list}")
             else:
                 self.speak("File operations are disabled in configuration.")
                 
-        # Web search
-        elif "search for" in command or "google" in command:
+        # Web search and questions
+        elif intent in ("web_search", "question"):
             if self.config["web_search"]:
-                search_query = command.replace("search for", "").replace("google", "").strip()
+                if intent == "question":
+                    search_query = question_subject(command)
+                else:
+                    search_query = command.replace("search for", "").replace("google", "").strip()
                 if search_query:
-                    search_url = f"https://www.google.com/search?q={search_query.replace(' ', '+')}"
-                    webbrowser.open(search_url)
-                    self.speak(f"Searching for {search_query}")
+                    self.answer_question(search_query)
                 else:
                     self.speak("What would you like me to search for?")
             else:
                 self.speak("Web search is disabled in configuration.")
                 
         # Open applications
-        elif "open" in command:
+        elif intent == "open_app":
             app_name = command.replace("open", "").strip()
             if app_name:
+                app = None
+                if self.app_catalog is not None:
+                    self.app_catalog.ready.wait(timeout=2.0)
+                    app = self.app_catalog.lookup(app_name)
                 try:
-                    if platform.system() == "Windows":
-                        os.startfile(app_name)
-                    elif platform.system() == "Darwin":  # macOS
-                        subprocess.run(["open", "-a", app_name])
-                    else:  # Linux
-                        subprocess.run(["xdg-open", app_name])
-                    self.speak(f"Opening {app_name}")
+                    if app:
+                        launch_detached(app["target"])
+                        self.speak(f"Opening {app['name']}")
+                    elif is_denied(app_name.split()):
+                        self.speak(f"Sorry Master, I won't open {app_name}")
+                    else:
+                        # Not a known application, let the desktop try it as a name or path
+                        launch_detached(app_name)
+                        self.speak(f"Opening {app_name}")
                 except:
                     self.speak(f"Sorry Master, I couldn't open {app_name}")
                     
         # System commands
-        elif "shutdown" in command or "turn off" in command:
+        elif intent == "shutdown":
             if self.config["system_commands"]:
                 self.speak("Shutting down the system, Master.")
                 if platform.system() == "Windows":
@@ -248,7 +914,7 @@ class AdvancedVoiceAssistant:
             else:
                 self.speak("System commands are disabled in configuration.")
                 
-        elif "restart" in command:
+        elif intent == "restart":
             if self.config["system_commands"]:
                 self.speak("Restarting the system, Master.")
                 if platform.system() == "Windows":
@@ -258,13 +924,8 @@ class AdvancedVoiceAssistant:
             else:
                 self.speak("System commands are disabled in configuration.")
                 
-        # Help commands
-        elif "help" in command or "what can you do" in command:
-            help_text = "I can help you with: telling time and date, system information, listing files, web searches, opening applications, and system control. Just ask me what you need, Master."
-            self.speak(help_text)
-            
         # Exit commands
-        elif any(word in command for word in ["exit", "quit", "stop", "goodbye"]):
+        elif intent == "exit":
             self.speak("Goodbye Master! Have a great day!")
             return False
             
@@ -275,34 +936,61 @@ class AdvancedVoiceAssistant:
         
     def run(self):
         """Main run loop"""
-        self.speak("Advanced Voice Assistant initialized. Looking for Master...")
+        # Queued rather than spoken so the camera window comes up first
+        self.voice_queue.put("Advanced Voice Assistant initialized. Looking for Master...")
+        speech_deadline = time.monotonic() + self.config["speech_hold_timeout"]
+        startup_reported = False
+        self.running = True
         
         try:
-            while True:
+            while self.running:
                 # Face recognition
-                ret, frame = self.cap.read()
-                if not ret:
+                if not self.poll_cameras():
                     break
                     
-                frame = self.identify_face(frame)
-                
-                # Show frame
-                cv2.imshow('Advanced Voice Assistant - Face Recognition', frame)
+                # Show frames
+                for camera in list(self.cameras):
+                    if camera.display_frame is not None:
+                        if self.config["show_window"]:
+                            cv2.imshow(f'Advanced Voice Assistant - Face Recognition - {camera.name}', camera.display_frame)
+                        self.startup.mark("first_frame")
+                        
+                if not startup_reported and self.recognition_ready.is_set():
+                    self.startup.report()
+                    self.metrics["startup"] = self.startup.as_dict()
+                    startup_reported = True
+                    
+                # Speak announcements queued by recognition workers. Creating the speech engine and
+                # speaking block this loop, so nothing is said before the first frame is on screen
+                if self.startup.reached("first_frame") or time.monotonic() >= speech_deadline:
+                    while not self.voice_queue.empty():
+                        self.speak(self.voice_queue.get())
+                        self.startup.mark("first_speech")
+                    
+                # Text commands sent through the daemon socket
+                if not self.process_remote_commands():
+                    break
                 
                 # Listen for commands if master is identified
                 if self.master_identified:
                     if not self.is_listening:
                         self.is_listening = True
-                        command = self.listen_for_command()
+                        heard = self.listen_for_command()
                         
-                        if command:
-                            if not self.execute_command(command):
+                        if heard:
+                            if not self.execute_command(*heard):
                                 break
                                 
                         self.is_listening = False
                         
-                # Handle key presses
-                if cv2.waitKey(1) & 0xFF == ord('q'):
+                # Wait for the next frame slot instead of busy-polling, handling key presses meanwhile
+                delay = self.governor.frame_delay()
+                # Capture threads decode no faster than the loop consumes frames
+                for camera in list(self.cameras):
+                    camera.max_fps = self.governor.effective_fps
+                if not self.config["show_window"]:
+                    time.sleep(delay)
+                elif cv2.waitKey(max(1, int(delay * 1000))) & 0xFF == ord('q'):
                     break
                     
         except KeyboardInterrupt:
@@ -312,9 +1000,24 @@ class AdvancedVoiceAssistant:
             
     def cleanup(self):
         """Clean up resources"""
-        self.cap.release()
+        self.running = False
+        while not self.remote_commands.empty():
+            _, future = self.remote_commands.get()
+            future.set_exception(RuntimeError("Assistant is shutting down"))
+        self.startup_pool.shutdown(wait=True)
+        self.speech_pool.shutdown(wait=False)
+        if self.recognition_pool is not None:
+            self.recognition_pool.shutdown(wait=True)
+        for camera in self.cameras:
+            camera.stop()
+        if self.file_index is not None:
+            self.file_index.stop()
+        self.web_answers.close()
         cv2.destroyAllWindows()
-        self.engine.stop()
+        if self.speech_renderer is not None:
+            self.speech_renderer.cleanup()
+        if self._engine is not None:
+            self._engine.stop()
         
         # Save conversation history
         with open("conversation_history.json", "w") as f:
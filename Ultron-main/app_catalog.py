@@ -0,0 +1,280 @@
+"""
+Application catalog for the voice assistant
+Collects launchable GUI applications (.desktop files, macOS bundles,
+Windows Start Menu shortcuts), caches them on disk, and matches spoken
+names against them with a trigram index
+"""
+
+import json
+import os
+import platform
+import re
+import shlex
+import subprocess
+import threading
+from collections import defaultdict
+
+CATALOG_VERSION = 2
+
+# Desktop entry field codes (%f, %U, ...) are placeholders, not arguments
+FIELD_CODE = re.compile(r"%[a-zA-Z]")
+NON_ALNUM = re.compile(r"[^a-z0-9]+")
+FILLER_WORDS = {"the", "app", "application", "program", "please", "up", "my"}
+
+# Never launched by "open", even when a desktop entry runs them: power and session
+# control stays behind the system_commands setting, and the rest destroy data
+DENIED_COMMANDS = {"shutdown", "reboot", "poweroff", "halt", "init", "telinit", "systemctl", "loginctl",
+                   "gnome-session-quit", "xfce4-session-logout", "rm", "dd", "mkfs", "shred",
+                   "kill", "killall", "pkill", "sudo", "su", "pkexec"}
+
+
+def normalize(text):
+    """Lower-case, punctuation-free, filler-free form of a name"""
+    words = [w for w in NON_ALNUM.sub(" ", text.lower()).split() if w not in FILLER_WORDS]
+    return " ".join(words)
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def is_denied(command):
+    """Whether a command line runs anything from DENIED_COMMANDS, also inside sh -c strings"""
+    words = [os.path.basename(word) for arg in command for word in arg.split()]
+    return any(word in DENIED_COMMANDS or word.startswith("mkfs.") for word in words)
+
+
+def application_dirs():
+    """Directories to scan for applications on this platform, as (directory, kind)"""
+    system = platform.system()
+    dirs = []
+    if system == "Windows":
+        for base in (os.getenv("PROGRAMDATA"), os.getenv("APPDATA")):
+            if base:
+                dirs.append((os.path.join(base, "Microsoft", "Windows", "Start Menu", "Programs"), "shortcut"))
+    elif system == "Darwin":
+        for base in ("/Applications", "/System/Applications", os.path.expanduser("~/Applications")):
+            dirs.append((base, "bundle"))
+    else:
+        data_home = os.getenv("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+        data_dirs = (os.getenv("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(":")
+        for base in [data_home] + data_dirs + ["/var/lib/flatpak/exports/share",
+                                               os.path.expanduser("~/.local/share/flatpak/exports/share")]:
+            dirs.append((os.path.join(base, "applications"), "desktop"))
+        dirs.append(("/var/lib/snapd/desktop/applications", "desktop"))
+
+    # Keep the first occurrence of each directory, and only ones that exist
+    seen = set()
+    result = []
+    for directory, kind in dirs:
+        directory = os.path.abspath(directory)
+        if directory not in seen and os.path.isdir(directory):
+            seen.add(directory)
+            result.append((directory, kind))
+    return result
+
+
+def parse_desktop_file(path):
+    """Read the [Desktop Entry] section of a .desktop file, None if it is not a visible application"""
+    fields = {}
+    in_entry = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line:
+                    key, value = line.split("=", 1)
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+
+    if fields.get("Type", "Application") != "Application" or "Exec" not in fields or "Name" not in fields:
+        return None
+    if fields.get("NoDisplay", "").lower() == "true" or fields.get("Hidden", "").lower() == "true":
+        return None
+
+    try:
+        command = [arg for arg in shlex.split(FIELD_CODE.sub("", fields["Exec"])) if arg]
+    except ValueError:
+        return None
+    if not command or is_denied(command):
+        return None
+
+    aliases = [fields["Name"]]
+    if fields.get("GenericName"):
+        aliases.append(fields["GenericName"])
+    aliases += [k for k in fields.get("Keywords", "").split(";") if k]
+    aliases.append(os.path.basename(command[0]))
+    return {"name": fields["Name"], "kind": "desktop", "target": command, "aliases": aliases}
+
+
+def scan_directory(directory, kind):
+    """List the applications in one directory"""
+    entries = []
+    if kind == "shortcut":
+        # Start Menu shortcuts live in nested program folders
+        for root, _, files in os.walk(directory):
+            for file_name in sorted(files):
+                if file_name.lower().endswith(".lnk"):
+                    label = file_name[:-4]
+                    entries.append({"name": label, "kind": "shortcut",
+                                    "target": os.path.join(root, file_name), "aliases": [label]})
+        return entries
+
+    try:
+        names = sorted(os.listdir(directory))
+    except OSError:
+        return entries
+
+    for name in names:
+        path = os.path.join(directory, name)
+        if kind == "desktop" and name.endswith(".desktop"):
+            entry = parse_desktop_file(path)
+            if entry:
+                entries.append(entry)
+        elif kind == "bundle" and name.endswith(".app"):
+            label = name[:-4]
+            entries.append({"name": label, "kind": "bundle", "target": path, "aliases": [label]})
+    return entries
+
+
+class AppCatalog:
+    """Launchable applications with fuzzy name lookup.
+
+    The catalog is cached in cache_path together with the modification time
+    of every scanned directory; it is rebuilt only when one of them changes.
+    """
+
+    def __init__(self, cache_path="app_catalog.json", min_score=0.45):
+        self.cache_path = cache_path
+        self.min_score = min_score
+        self.entries = []
+        self.exact = {}
+        self.alias_names = []
+        self.alias_entries = []
+        self.alias_sizes = []
+        self.by_trigram = defaultdict(list)
+        self.ready = threading.Event()
+        self.stats = {"entries": 0, "from_cache": False}
+
+    def load_or_build(self):
+        """Use the cached catalog if no application directory changed, else rebuild it"""
+        dirs = application_dirs()
+        mtimes = {}
+        for directory, _ in dirs:
+            try:
+                mtimes[directory] = os.stat(directory).st_mtime
+            except OSError:
+                pass
+
+        cached = self._load_cache()
+        if cached and cached.get("dir_mtimes") == mtimes:
+            entries = cached["entries"]
+            self.stats["from_cache"] = True
+        else:
+            entries = []
+            for directory, kind in dirs:
+                entries += scan_directory(directory, kind)
+            self._save_cache(mtimes, entries)
+            self.stats["from_cache"] = False
+
+        self._build_index(entries)
+        self.ready.set()
+        return self
+
+    def start(self):
+        """Load or build the catalog on a background thread"""
+        threading.Thread(target=self.load_or_build, name="app-catalog", daemon=True).start()
+        return self
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if data.get("version") == CATALOG_VERSION else None
+
+    def _save_cache(self, mtimes, entries):
+        try:
+            with open(self.cache_path, "w") as f:
+                json.dump({"version": CATALOG_VERSION, "dir_mtimes": mtimes, "entries": entries}, f)
+        except OSError as e:
+            print(f"Could not save application catalog: {e}")
+
+    def _build_index(self, entries):
+        exact = {}
+        alias_names, alias_entries, alias_sizes = [], [], []
+        by_trigram = defaultdict(list)
+        for entry_id, entry in enumerate(entries):
+            for alias in entry["aliases"]:
+                key = normalize(alias)
+                if not key:
+                    continue
+                # Earlier directories win exact matches, as they do in XDG lookups
+                exact.setdefault(key, entry_id)
+                alias_id = len(alias_names)
+                alias_names.append(key)
+                alias_entries.append(entry_id)
+                grams = trigrams(key)
+                alias_sizes.append(len(grams))
+                for gram in grams:
+                    by_trigram[gram].append(alias_id)
+
+        self.entries = entries
+        self.exact = exact
+        self.alias_names = alias_names
+        self.alias_entries = alias_entries
+        self.alias_sizes = alias_sizes
+        self.by_trigram = by_trigram
+        self.stats["entries"] = len(entries)
+
+    def lookup(self, spoken_name):
+        """Best matching application for a spoken name, or None"""
+        query = normalize(spoken_name)
+        if not query:
+            return None
+        entry_id = self.exact.get(query)
+        if entry_id is not None:
+            return self.entries[entry_id]
+
+        # Dice similarity over shared trigrams, counted through the inverted index
+        grams = trigrams(query)
+        shared = defaultdict(int)
+        for gram in grams:
+            for alias_id in self.by_trigram.get(gram, ()):
+                shared[alias_id] += 1
+
+        best_score, best_entry = 0.0, None
+        for alias_id, count in shared.items():
+            entry_id = self.alias_entries[alias_id]
+            score = 2.0 * count / (len(grams) + self.alias_sizes[alias_id])
+            if self.alias_names[alias_id].startswith(query):
+                score += 0.1
+            if score > best_score:
+                best_score, best_entry = score, entry_id
+
+        if best_entry is None or best_score < self.min_score:
+            return None
+        return self.entries[best_entry]
+
+
+def launch_detached(target):
+    """Start an application without waiting for it or tying it to our terminal"""
+    system = platform.system()
+    if system == "Windows":
+        if isinstance(target, list):
+            subprocess.Popen(target, creationflags=subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP,
+                             stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        else:
+            os.startfile(target)
+        return
+
+    if isinstance(target, str):
+        # macOS bundles and anything else handed to the desktop's opener
+        target = ["open", "-a", target] if system == "Darwin" else ["xdg-open", target]
+    subprocess.Popen(target, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                     stderr=subprocess.DEVNULL, start_new_session=True, close_fds=True)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Long-lived voice assistant daemon
+Keeps one warm AdvancedVoiceAssistant running and exposes a local
+Unix-domain-socket API for text commands, presence and metrics
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+CONFIG_FILE = "assistant_config.json"
+# Where the launcher sends the daemon's output, so it stays out of the attached prompt
+DAEMON_LOG = "assistant_daemon.log"
+
+# socketserver only defines the Unix server classes where AF_UNIX exists
+UnixStreamServer = getattr(socketserver, "UnixStreamServer", socketserver.TCPServer)
+
+
+def default_socket_path():
+    """Socket path from assistant_config.json, or one in a per-user directory under the temp directory"""
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            path = json.load(f).get("daemon_socket")
+        if path:
+            return os.path.expanduser(path)
+    except (OSError, ValueError):
+        pass
+    user = os.getuid() if hasattr(os, "getuid") else os.getenv("USERNAME", "user")
+    return os.path.join(tempfile.gettempdir(), f"ultron-assistant-{user}", "assistant.sock")
+
+
+def prepare_socket_dir(socket_path):
+    """Create the socket's directory owner-only, and refuse the default one if others can get into it"""
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # A configured directory is the user's choice, the default one in the shared temp directory must be ours
+    if hasattr(os, "getuid") and os.path.basename(directory).startswith("ultron-assistant-"):
+        st = os.stat(directory)
+        if st.st_uid != os.getuid() or st.st_mode & 0o077:
+            raise RuntimeError(f"{directory} is not private to this user, refusing to create the socket there")
+
+
+class AssistantRequestHandler(socketserver.StreamRequestHandler):
+    """Handles newline-delimited JSON requests, one response line per request"""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                response = self.server.dispatch(request)
+            except Exception as e:
+                response = {"ok": False, "error": str(e)}
+            self.wfile.write((json.dumps(response, default=str) + "\n").encode("utf-8"))
+            self.wfile.flush()
+
+
+class AssistantDaemon(socketserver.ThreadingMixIn, UnixStreamServer):
+    """Unix socket server in front of a running assistant.
+
+    Every client connection gets its own thread. Text commands are queued to
+    the assistant's main loop, which owns the camera windows and TTS engine;
+    presence and metrics are read directly. The assistant may be attached
+    after the socket is bound; until then only ping is answered.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, assistant, socket_path=None, command_timeout=60.0):
+        self.assistant = assistant
+        self.socket_path = socket_path or default_socket_path()
+        self.command_timeout = command_timeout
+        self.thread = None
+
+        prepare_socket_dir(self.socket_path)
+        # Remove a stale socket left behind by a crashed daemon
+        if os.path.exists(self.socket_path):
+            if daemon_running(self.socket_path):
+                raise RuntimeError(f"An assistant daemon is already running on {self.socket_path}")
+            os.unlink(self.socket_path)
+
+        # Create the socket owner-only from the start, a chmod afterwards leaves a window open
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(self.socket_path, AssistantRequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def dispatch(self, request):
+        """Run one request and return its response"""
+        action = request.get("action")
+        if action == "ping":
+            return {"ok": True, "pid": os.getpid(), "ready": self.assistant is not None}
+        if self.assistant is None:
+            return {"ok": False, "error": "Assistant is still starting"}
+        if action == "command":
+            text = (request.get("text") or "").strip()
+            if not text:
+                return {"ok": False, "error": "Missing command text"}
+            result = self.assistant.submit_command(text).result(self.command_timeout)
+            return dict(result, ok=True)
+        if action == "presence":
+            return dict(self.assistant.get_presence(), ok=True)
+        if action == "metrics":
+            return {"ok": True, "metrics": self.assistant.get_metrics()}
+        if action == "shutdown":
+            self.assistant.running = False
+            return {"ok": True}
+        return {"ok": False, "error": f"Unknown action: {action}"}
+
+    def start(self):
+        """Serve requests on a background thread"""
+        self.thread = threading.Thread(target=self.serve_forever, name="daemon-server", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and remove the socket file"""
+        self.shutdown()
+        self.server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class AssistantClient:
+    """Client for a running assistant daemon"""
+
+    def __init__(self, socket_path=None, timeout=65.0):
+        self.socket_path = socket_path or default_socket_path()
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(self.socket_path)
+        self.reader = self.sock.makefile("r", encoding="utf-8")
+
+    def request(self, action, **params):
+        """Send one request and wait for its response"""
+        params["action"] = action
+        self.sock.sendall((json.dumps(params) + "\n").encode("utf-8"))
+        line = self.reader.readline()
+        if not line:
+            raise ConnectionError("Assistant daemon closed the connection")
+        return json.loads(line)
+
+    def ping(self):
+        return self.request("ping")
+
+    def command(self, text):
+        """Run a text command, returns the assistant's spoken responses"""
+        return self.request("command", text=text)
+
+    def presence(self):
+        return self.request("presence")
+
+    def metrics(self):
+        return self.request("metrics")["metrics"]
+
+    def shutdown(self):
+        return self.request("shutdown")
+
+    def close(self):
+        self.reader.close()
+        self.sock.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def daemon_running(socket_path=None, ready=False):
+    """Check whether a daemon answers on the socket, with ready=True also that its assistant is up"""
+    if not hasattr(socket, "AF_UNIX"):
+        return False
+    try:
+        with AssistantClient(socket_path, timeout=1.0) as client:
+            response = client.ping()
+        return response.get("ok", False) and (not ready or response.get("ready", True))
+    except (OSError, ValueError):
+        return False
+
+
+def wait_for_daemon(socket_path=None, timeout=30.0):
+    """Wait for a freshly started daemon to accept commands"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if daemon_running(socket_path, ready=True):
+            return True
+        time.sleep(0.2)
+    return False
+
+
+def main():
+    """Start the assistant and serve it until it exits"""
+    parser = argparse.ArgumentParser(description="Run the voice assistant as a daemon")
+    parser.add_argument("--socket", help="Unix socket path (default from assistant_config.json)")
+    parser.add_argument("--no-window", action="store_true", help="Do not show camera windows")
+    args = parser.parse_args()
+
+    if not hasattr(socket, "AF_UNIX"):
+        print("❌ Daemon mode needs Unix domain sockets, which this platform does not support.")
+        sys.exit(1)
+
+    # Claim the socket before the assistant opens cameras and starts crawling files,
+    # so a second daemon gives up at once instead of after a full startup
+    try:
+        server = AssistantDaemon(None, args.socket).start()
+    except (OSError, RuntimeError) as e:
+        print(f"❌ Could not start the daemon: {e}")
+        sys.exit(1)
+    print(f"Assistant daemon listening on {server.socket_path}")
+
+    try:
+        from advanced_voice_assistant import AdvancedVoiceAssistant
+
+        assistant = AdvancedVoiceAssistant()
+        if args.no_window:
+            assistant.config["show_window"] = False
+        server.assistant = assistant
+        assistant.run()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
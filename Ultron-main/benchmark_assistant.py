@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Benchmark script for the voice assistant
+Measures startup through the real main loop, and recognition throughput
+without the GUI, microphone or speech output
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote
+
+from assistant_daemon import AssistantClient, daemon_running
+
+
+def benchmark_cameras(sources, duration=10.0):
+    """Measure aggregate recognition FPS for 1..N video sources"""
+    from advanced_voice_assistant import AdvancedVoiceAssistant
+
+    print("📷 Multi-camera recognition throughput")
+    print("-" * 50)
+    print(f"{'cameras':>8} {'aggregate fps':>14} {'per camera':>12} {'scaling':>8}")
+
+    baseline = None
+    results = []
+    for count in range(1, len(sources) + 1):
+        assistant = AdvancedVoiceAssistant(video_sources=sources[:count], enable_voice=False, enable_indexing=False)
+        assistant.wait_until_ready()
+        # Keep full recognition running for the whole measurement
+        assistant.presence.idle_after = float("inf")
+        assistant.presence.required_matches = float("inf")
+        for camera in assistant.cameras:
+            # Replay video files so every run gets the full duration
+            camera.loop = True
+            camera.wait_for_frame()
+
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration:
+            if not assistant.poll_cameras():
+                break
+            time.sleep(0.001)
+        elapsed = time.perf_counter() - start
+
+        processed = sum(camera.processed_frames for camera in assistant.cameras)
+        assistant.cleanup()
+
+        fps = processed / elapsed
+        baseline = baseline or fps
+        cameras = max(1, len(assistant.cameras))
+        results.append((count, fps))
+        print(f"{count:>8} {fps:>14.1f} {fps / cameras:>12.1f} {fps / baseline:>7.2f}x")
+
+    return results
+
+
+def benchmark_startup(sources, timeout=60.0):
+    """Measure time to the first camera frame, the first announcement and recognition being ready.
+
+    Runs the real main loop with speech on, so creating the speech engine counts too.
+    """
+    from advanced_voice_assistant import AdvancedVoiceAssistant
+
+    print("🚀 Startup time")
+    print("-" * 50)
+
+    assistant = AdvancedVoiceAssistant(video_sources=sources)
+
+    def stop_when_started():
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if assistant.recognition_ready.is_set() and assistant.startup.reached("first_speech"):
+                break
+            time.sleep(0.05)
+        else:
+            print(f"Startup did not finish within {timeout:.0f} s")
+        assistant.running = False
+
+    # run() prints the startup report itself once recognition is ready
+    threading.Thread(target=stop_when_started, daemon=True).start()
+    assistant.run()
+    print()
+    return assistant.startup.as_dict()
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def benchmark_daemon(duration=10.0, clients=4, command="what time is it"):
+    """Measure a running daemon: command round trips and recognition FPS"""
+    print("🔗 Assistant daemon")
+    print("-" * 50)
+
+    with AssistantClient() as client:
+        before = client.metrics()
+        start = time.perf_counter()
+
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            with AssistantClient() as worker_client:
+                while time.perf_counter() - start < duration:
+                    sent = time.perf_counter()
+                    worker_client.command(command)
+                    with lock:
+                        latencies.append((time.perf_counter() - sent) * 1000)
+
+        threads = [threading.Thread(target=worker) for _ in range(clients)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        elapsed = time.perf_counter() - start
+        after = client.metrics()
+
+    processed = sum(c["frames_processed"] for c in after["cameras"]) - sum(c["frames_processed"] for c in before["cameras"])
+    print(f"Recognition: {processed / elapsed:.1f} fps over {len(after['cameras'])} camera(s)")
+    if latencies:
+        print(f"Command '{command}' from {clients} clients: {len(latencies)} round trips, "
+              f"p50 {percentile(latencies, 0.5):.0f} ms, p99 {percentile(latencies, 0.99):.0f} ms")
+    print()
+    return after
+
+
+def benchmark_app_catalog(cache_path="app_catalog_benchmark.json", rounds=200):
+    """Measure application catalog build, cached load and lookup times"""
+    from app_catalog import AppCatalog
+
+    print("📂 Application catalog")
+    print("-" * 50)
+
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    start = time.perf_counter()
+    catalog = AppCatalog(cache_path).load_or_build()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    AppCatalog(cache_path).load_or_build()
+    cached_ms = (time.perf_counter() - start) * 1000
+    os.remove(cache_path)
+
+    # Exact names, plus the same names with a dropped letter as a stand-in for misheard speech
+    names = [entry["name"].lower() for entry in catalog.entries[::max(1, len(catalog.entries) // rounds)]]
+    queries = names + [name[:len(name) // 2] + name[len(name) // 2 + 1:] for name in names if len(name) > 3]
+
+    latencies = []
+    hits = 0
+    for query in queries:
+        start = time.perf_counter()
+        if catalog.lookup(query):
+            hits += 1
+        latencies.append((time.perf_counter() - start) * 1000)
+
+    print(f"Entries: {len(catalog.entries)}")
+    print(f"Build: {build_ms:.0f} ms, load from cache: {cached_ms:.0f} ms")
+    if latencies:
+        print(f"Lookup: {len(queries)} queries, {hits} matched, "
+              f"p50 {percentile(latencies, 0.5):.3f} ms, p99 {percentile(latencies, 0.99):.3f} ms")
+    print()
+
+
+def benchmark_command_matching(fixture_path="asr_nbest_fixtures.json"):
+    """Replay synthetic recognition alternatives, top hypothesis only versus all alternatives"""
+    from advanced_voice_assistant import AdvancedVoiceAssistant
+    from command_matcher import CommandMatcher, alternatives_from_result
+
+    print("🗣️  N-best command matching")
+    print("-" * 50)
+
+    with open(fixture_path, "r") as f:
+        fixtures = json.load(f)["utterances"]
+
+    classify = AdvancedVoiceAssistant.classify_command
+    matcher = CommandMatcher()
+    # Import numpy and build the phrase matrix outside the timed lookups
+    matcher.score(["hello"])
+    counts = {"top": {"retries": 0, "wrong": 0}, "nbest": {"retries": 0, "wrong": 0}}
+    latencies = []
+    for fixture in fixtures:
+        alternatives = alternatives_from_result(fixture["result"])
+        expected = fixture["expected"]
+        if alternatives:
+            top_intent = classify(alternatives[0])
+            start = time.perf_counter()
+            command, intent = matcher.choose(alternatives, classify)
+            latencies.append((time.perf_counter() - start) * 1000)
+            nbest_intent = intent or classify(command)
+        else:
+            top_intent = nbest_intent = "unknown"
+
+        for name, got in (("top", top_intent), ("nbest", nbest_intent)):
+            if got == expected:
+                continue
+            # "I didn't understand" means Master repeats the command, anything else ran the wrong one
+            counts[name]["retries" if got == "unknown" else "wrong"] += 1
+
+    saved = counts["top"]["retries"] - counts["nbest"]["retries"]
+    print(f"Utterances: {len(fixtures)} (synthetic fixtures written for these commands, not recorded speech)")
+    for name, label in (("top", "Top hypothesis"), ("nbest", "All alternatives")):
+        print(f"{label}: {counts[name]['retries']} retries, {counts[name]['wrong']} wrong commands")
+    print(f"Retries saved: {saved}")
+    if latencies:
+        print(f"Matching: p50 {percentile(latencies, 0.5):.3f} ms, p99 {percentile(latencies, 0.99):.3f} ms")
+    print()
+    return counts
+
+
+class StubAnswerHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the answer endpoints, with a fixed response delay"""
+
+    delay = 0.02
+
+    def do_GET(self):
+        time.sleep(self.delay)
+        path, _, query = self.path.partition("?")
+        if path.startswith("/summary/"):
+            body = {"extract": f"Summary of {unquote(path[len('/summary/'):])}. A second sentence."}
+        else:
+            body = {"AbstractText": "" if "nothing" in query else f"Abstract for {query}."}
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def benchmark_web_answers(questions=400, distinct=60, cache_path="web_answer_cache_benchmark.json"):
+    """Measure web answer fetch latency and cache hit rate against a local stub server"""
+    from web_answers import WebAnswers
+
+    print("🌐 Web answers (local stub server)")
+    print("-" * 50)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubAnswerHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    endpoints = [
+        {"name": "abstract", "field": "AbstractText", "url": base + "/abstract?q={query}"},
+        {"name": "summary", "field": "extract", "url": base + "/summary/{title}"},
+    ]
+
+    # Popular questions come up again and again, roughly Zipf distributed
+    topics = [f"topic {i}" if i % 4 else f"nothing {i}" for i in range(distinct)]
+    rng = random.Random(0)
+    weights = [1.0 / (rank + 1) for rank in range(distinct)]
+    asked = rng.choices(topics, weights, k=questions)
+
+    if os.path.exists(cache_path):
+        os.remove(cache_path)
+    answers = WebAnswers(endpoints, timeout=2.0, cache_path=cache_path)
+    latencies = []
+    for question in asked:
+        start = time.perf_counter()
+        answers.answer(question)
+        latencies.append((time.perf_counter() - start) * 1000)
+    stats = answers.snapshot()
+    answers.close()
+
+    # A restarted assistant starts with the saved cache
+    restarted = WebAnswers(endpoints, timeout=2.0, cache_path=cache_path)
+    restarted.answer(asked[0])
+    warm_hits = restarted.snapshot()["cache_hits"]
+    restarted.close()
+    server.shutdown()
+    server.server_close()
+    os.remove(cache_path)
+
+    print(f"Questions: {questions} ({distinct} distinct), stub delay {StubAnswerHandler.delay * 1000:.0f} ms")
+    print(f"Cache hit rate: {stats['cache_hit_rate']:.0%}, {stats['cache_entries']} entries, "
+          f"{'kept' if warm_hits else 'lost'} across restart")
+    print(f"Fetch: {stats['fetches']} fan-outs, p50 {stats['fetch_p50_ms']:.1f} ms, p99 {stats['fetch_p99_ms']:.1f} ms")
+    print(f"Answer incl. cache: p50 {percentile(latencies, 0.5):.2f} ms, p99 {percentile(latencies, 0.99):.2f} ms")
+    print()
+    return stats
+
+
+def main():
+    """Run the selected benchmarks"""
+    parser = argparse.ArgumentParser(description="Voice assistant benchmarks")
+    parser.add_argument("--source", action="append", default=[],
+                        help="Video source (camera index or file), repeat for more cameras")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per measurement")
+    args = parser.parse_args()
+
+    print("⏱️  Voice Assistant Benchmarks")
+    print("=" * 50)
+
+    benchmark_app_catalog()
+    benchmark_command_matching()
+    benchmark_web_answers()
+
+    # A running daemon owns the cameras, so measure it rather than cold-starting another assistant
+    if daemon_running():
+        benchmark_daemon(args.duration)
+        return
+
+    sources = [int(s) if s.isdigit() else s for s in args.source] or [0]
+    benchmark_startup(sources[:1])
+    benchmark_cameras(sources, args.duration)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Threaded video capture for the voice assistant
+Each source gets its own capture thread that keeps only the newest frame,
+so slow recognition never backs up the camera
+"""
+
+import threading
+import time
+
+from startup import LazyModule
+
+cv2 = LazyModule("cv2")
+
+
+class CameraStream:
+    """A video source read continuously on a background thread.
+
+    Besides the latest frame, the stream carries the per-camera recognition
+    state (last face boxes and names) so several cameras can share one
+    recognition worker pool without mixing up their tracks.
+    """
+
+    def __init__(self, source, camera_id=0, loop=False, max_fps=None):
+        self.source = source
+        self.camera_id = camera_id
+        self.loop = loop
+        # Frames decoded per second at most, None decodes every frame the source delivers
+        self.max_fps = max_fps
+        self.cap = cv2.VideoCapture(source)
+
+        self.lock = threading.Lock()
+        self.frame = None
+        self.frame_id = 0
+        self.running = False
+        self.thread = None
+
+        # Recognition state for this camera
+        self.face_locations = []
+        self.face_names = []
+        self.process_this_frame = True
+        self.frames_since_full_scan = 0
+        self.detector = None
+        self.motion_detector = None
+        self.last_processed_id = 0
+        self.processed_frames = 0
+        self.submitted_at = 0.0
+        self.display_frame = None
+
+    @property
+    def name(self):
+        return f"Camera {self.camera_id}"
+
+    def is_opened(self):
+        return self.cap.isOpened()
+
+    def start(self):
+        """Start the capture thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self._update, name=f"capture-{self.camera_id}", daemon=True)
+        self.thread.start()
+        return self
+
+    def _update(self):
+        next_frame = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            if self.max_fps and now < next_frame:
+                # Between frame slots only grab, which keeps the driver's buffer fresh without decoding
+                if not self.cap.grab() and not self._rewind():
+                    break
+                continue
+
+            ret, frame = self.cap.read()
+            if not ret:
+                if self._rewind():
+                    continue
+                break
+            with self.lock:
+                self.frame = frame
+                self.frame_id += 1
+            if self.max_fps:
+                next_frame = max(next_frame + 1.0 / self.max_fps, now)
+
+    def _rewind(self):
+        """Restart a looping video at the end of the stream, returns False when capture is over"""
+        if self.loop and self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0):
+            return True
+        self.running = False
+        return False
+
+    def read(self):
+        """Return (frame_id, frame) for the newest frame, frame is None until one arrives"""
+        with self.lock:
+            return self.frame_id, self.frame
+
+    def wait_for_frame(self, timeout=5.0):
+        """Block until the first frame is available"""
+        deadline = time.time() + timeout
+        while self.frame is None and self.running and time.time() < deadline:
+            time.sleep(0.01)
+        return self.read()[1]
+
+    def stop(self):
+        """Stop the capture thread and release the device"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.cap.release()
@@ -0,0 +1,124 @@
+"""
+N-best command matching for the voice assistant
+Scores every recognition alternative against every registered command
+phrase in one pass, so a slightly wrong top hypothesis does not force
+Master to repeat the whole command
+"""
+
+import re
+
+from startup import LazyModule
+
+np = LazyModule("numpy")
+
+NON_ALNUM = re.compile(r"[^a-z0-9']+")
+
+# Phrases that identify each command, in the same order the keyword classifier
+# checks them. Shutdown and restart are left out on purpose: they only run when
+# the top hypothesis says so, never from a guess among the alternatives.
+COMMAND_PHRASES = {
+    "file_search": ["find", "locate", "where is", "where are"],
+    "greeting": ["hello", "hi", "hey"],
+    "time": ["what time is it", "time"],
+    "date": ["what is the date", "what's the date", "date", "what day is it"],
+    "system_info": ["system info", "system information"],
+    "list_files": ["list files", "show files"],
+    "web_search": ["search for", "google"],
+    "open_app": ["open"],
+    "help": ["help", "what can you do"],
+    "exit": ["exit", "quit", "stop", "goodbye"],
+}
+
+
+def normalize(text):
+    return " ".join(NON_ALNUM.sub(" ", text.lower()).split())
+
+
+def trigrams(text):
+    padded = f" {normalize(text)} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def alternatives_from_result(result):
+    """Transcripts from a recognize_google(show_all=True) result, best first"""
+    if not isinstance(result, dict):
+        return []
+    return [alt["transcript"].lower() for alt in result.get("alternative", []) if alt.get("transcript")]
+
+
+class CommandMatcher:
+    """Character trigram matcher from transcripts to command names.
+
+    The score of a phrase for a transcript is the share of the phrase's
+    trigrams found in the transcript, so commands followed by an argument
+    ("open firefox") still score fully. Lower-ranked alternatives are
+    discounted by rank_penalty per rank.
+    """
+
+    def __init__(self, commands=None, threshold=0.8, rank_penalty=0.05):
+        self.commands = commands or COMMAND_PHRASES
+        self.threshold = threshold
+        self.rank_penalty = rank_penalty
+
+        self.phrase_intents = []
+        self.phrase_grams = []
+        for intent, phrases in self.commands.items():
+            for phrase in phrases:
+                self.phrase_intents.append(intent)
+                self.phrase_grams.append(trigrams(phrase))
+        self.vocabulary = {}
+        for grams in self.phrase_grams:
+            for gram in grams:
+                self.vocabulary.setdefault(gram, len(self.vocabulary))
+
+        # Built on first use so creating a matcher does not import numpy
+        self.phrase_matrix = None
+        self.phrase_sizes = None
+
+    def _build_matrix(self):
+        matrix = np.zeros((len(self.phrase_grams), len(self.vocabulary)), dtype=np.float32)
+        for row, grams in enumerate(self.phrase_grams):
+            matrix[row, [self.vocabulary[gram] for gram in grams]] = 1.0
+        self.phrase_sizes = matrix.sum(axis=1)
+        self.phrase_matrix = matrix
+
+    def score(self, transcripts):
+        """Score matrix of shape (transcripts, phrases), with the rank discount applied"""
+        if self.phrase_matrix is None:
+            self._build_matrix()
+        present = np.zeros((len(transcripts), len(self.vocabulary)), dtype=np.float32)
+        for row, transcript in enumerate(transcripts):
+            columns = [self.vocabulary[gram] for gram in trigrams(transcript) if gram in self.vocabulary]
+            present[row, columns] = 1.0
+
+        scores = (present @ self.phrase_matrix.T) / self.phrase_sizes
+        ranks = np.arange(len(transcripts), dtype=np.float32)
+        return scores * np.maximum(0.0, 1.0 - self.rank_penalty * ranks)[:, None]
+
+    def best(self, transcripts):
+        """(transcript, command, score) of the best match, or None below the threshold"""
+        if not transcripts:
+            return None
+        scores = self.score(transcripts)
+        # On equal scores the longer, more specific phrase wins
+        ranking = scores + 1e-4 * self.phrase_sizes / self.phrase_sizes.max()
+        row, column = np.unravel_index(np.argmax(ranking), ranking.shape)
+        score = float(scores[row, column])
+        if score < self.threshold:
+            return None
+        return transcripts[row], self.phrase_intents[column], score
+
+    def choose(self, transcripts, classify):
+        """Pick the transcript and command to run from recognition alternatives.
+
+        The top hypothesis is used as before whenever the keyword classifier
+        understands it. Only when it does not are all alternatives scored.
+        Returns (transcript, command), command is None to let the caller classify.
+        """
+        top = transcripts[0]
+        if classify(top) != "unknown":
+            return top, None
+        match = self.best(transcripts)
+        if match is None:
+            return top, None
+        return match[0], match[1]
@@ -0,0 +1,235 @@
+"""
+Face detector backends for the voice assistant
+Wraps HOG, dlib CNN and OpenCV DNN/Haar detection behind one interface
+and picks the fastest usable backend for the local machine
+"""
+
+import os
+import time
+
+from startup import LazyModule
+
+cv2 = LazyModule("cv2")
+face_recognition = LazyModule("face_recognition")
+
+# OpenCV DNN face model (res10 SSD). Download both files into models/ to enable it.
+DNN_PROTOTXT = os.path.join("models", "deploy.prototxt")
+DNN_MODEL = os.path.join("models", "res10_300x300_ssd_iter_140000.caffemodel")
+
+# Order matters: the first available backend is the accuracy reference for calibration
+DETECTOR_NAMES = ["cnn", "dnn", "hog", "haar"]
+
+
+class FaceDetector:
+    """Base class for face detectors.
+
+    Detectors take RGB frames and return face boxes as (top, right, bottom, left)
+    tuples, the same convention face_recognition uses.
+    """
+
+    name = "base"
+    supports_batch = False
+
+    def detect(self, rgb_frame):
+        raise NotImplementedError
+
+    def detect_batch(self, rgb_frames):
+        """Detect faces in several frames at once"""
+        return [self.detect(frame) for frame in rgb_frames]
+
+
+class HOGDetector(FaceDetector):
+    """dlib HOG detector (face_recognition default)"""
+
+    name = "hog"
+
+    def __init__(self, upsample=1):
+        self.upsample = upsample
+
+    def detect(self, rgb_frame):
+        return face_recognition.face_locations(rgb_frame, self.upsample, model="hog")
+
+
+class CNNDetector(FaceDetector):
+    """dlib CNN detector, more accurate and handles profile faces"""
+
+    name = "cnn"
+    supports_batch = True
+
+    def __init__(self, upsample=1, batch_size=8):
+        self.upsample = upsample
+        self.batch_size = batch_size
+
+    def detect(self, rgb_frame):
+        return face_recognition.face_locations(rgb_frame, self.upsample, model="cnn")
+
+    def detect_batch(self, rgb_frames):
+        # batch_face_locations needs frames of identical size
+        if len({frame.shape for frame in rgb_frames}) > 1:
+            return super().detect_batch(rgb_frames)
+        return face_recognition.batch_face_locations(
+            list(rgb_frames), self.upsample, batch_size=self.batch_size
+        )
+
+
+class OpenCVDNNDetector(FaceDetector):
+    """OpenCV DNN detector using the res10 SSD Caffe model"""
+
+    name = "dnn"
+    supports_batch = True
+
+    def __init__(self, prototxt=DNN_PROTOTXT, model=DNN_MODEL, confidence=0.5):
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, model)
+        self.confidence = confidence
+
+    @staticmethod
+    def is_available(prototxt=DNN_PROTOTXT, model=DNN_MODEL):
+        return os.path.exists(prototxt) and os.path.exists(model)
+
+    def _blob(self, rgb_frames):
+        bgr_frames = [cv2.cvtColor(cv2.resize(frame, (300, 300)), cv2.COLOR_RGB2BGR) for frame in rgb_frames]
+        return cv2.dnn.blobFromImages(bgr_frames, 1.0, (300, 300), (104.0, 177.0, 123.0))
+
+    def _boxes(self, detections, image_index, shape):
+        height, width = shape[:2]
+        boxes = []
+        rows = detections[0, 0]
+        for row in rows[rows[:, 0] == image_index]:
+            if row[2] < self.confidence:
+                continue
+            left = max(0, int(row[3] * width))
+            top = max(0, int(row[4] * height))
+            right = min(width, int(row[5] * width))
+            bottom = min(height, int(row[6] * height))
+            if right > left and bottom > top:
+                boxes.append((top, right, bottom, left))
+        return boxes
+
+    def detect(self, rgb_frame):
+        return self.detect_batch([rgb_frame])[0]
+
+    def detect_batch(self, rgb_frames):
+        self.net.setInput(self._blob(rgb_frames))
+        detections = self.net.forward()
+        return [self._boxes(detections, i, frame.shape) for i, frame in enumerate(rgb_frames)]
+
+
+class HaarDetector(FaceDetector):
+    """OpenCV Haar cascades, frontal plus profile. Fastest, least accurate"""
+
+    name = "haar"
+
+    def __init__(self, scale_factor=1.1, min_neighbors=5):
+        cascade_dir = cv2.data.haarcascades
+        self.frontal = cv2.CascadeClassifier(os.path.join(cascade_dir, "haarcascade_frontalface_default.xml"))
+        self.profile = cv2.CascadeClassifier(os.path.join(cascade_dir, "haarcascade_profileface.xml"))
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+
+    def detect(self, rgb_frame):
+        gray = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2GRAY)
+        boxes = []
+        for cascade in (self.frontal, self.profile):
+            if cascade.empty():
+                continue
+            for (x, y, w, h) in cascade.detectMultiScale(gray, self.scale_factor, self.min_neighbors):
+                box = (int(y), int(x + w), int(y + h), int(x))
+                if not any(box_iou(box, other) > 0.3 for other in boxes):
+                    boxes.append(box)
+        return boxes
+
+
+def create_detector(name):
+    """Create a detector backend by name"""
+    if name == "hog":
+        return HOGDetector()
+    if name == "cnn":
+        return CNNDetector()
+    if name == "dnn":
+        return OpenCVDNNDetector()
+    if name == "haar":
+        return HaarDetector()
+    raise ValueError(f"Unknown face detector: {name}")
+
+
+def available_detectors():
+    """Instantiate every backend that can run on this machine"""
+    detectors = []
+    for name in DETECTOR_NAMES:
+        if name == "dnn" and not OpenCVDNNDetector.is_available():
+            continue
+        try:
+            detectors.append(create_detector(name))
+        except Exception as e:
+            print(f"Face detector '{name}' unavailable: {e}")
+    return detectors
+
+
+def box_iou(a, b):
+    """Intersection over union of two (top, right, bottom, left) boxes"""
+    top, right = max(a[0], b[0]), min(a[1], b[1])
+    bottom, left = min(a[2], b[2]), max(a[3], b[3])
+    if right <= left or bottom <= top:
+        return 0.0
+    intersection = (right - left) * (bottom - top)
+    area_a = (a[1] - a[3]) * (a[2] - a[0])
+    area_b = (b[1] - b[3]) * (b[2] - b[0])
+    return intersection / float(area_a + area_b - intersection)
+
+
+def detection_recall(reference, detected, iou_threshold=0.4):
+    """Fraction of reference boxes found by another detector, None without reference boxes"""
+    total = sum(len(boxes) for boxes in reference)
+    if total == 0:
+        return None
+    found = 0
+    for ref_boxes, boxes in zip(reference, detected):
+        for ref in ref_boxes:
+            if any(box_iou(ref, box) >= iou_threshold for box in boxes):
+                found += 1
+    return found / total
+
+
+def calibrate_detectors(rgb_frames, accuracy_floor=0.8, detectors=None):
+    """Benchmark every available backend on sample frames.
+
+    The most accurate available backend provides the reference boxes. Returns
+    the name of the fastest backend whose recall meets accuracy_floor, along
+    with per-backend results. The name is None when the frames say nothing
+    about accuracy (no frames, or no face in any of them).
+    """
+    detectors = detectors if detectors is not None else available_detectors()
+    if not detectors or not rgb_frames:
+        return None, {}
+
+    results = {}
+    reference = None
+    for detector in detectors:
+        try:
+            start = time.perf_counter()
+            if detector.supports_batch:
+                detected = detector.detect_batch(rgb_frames)
+            else:
+                detected = [detector.detect(frame) for frame in rgb_frames]
+            elapsed = time.perf_counter() - start
+        except Exception as e:
+            print(f"Calibration of '{detector.name}' failed: {e}")
+            continue
+
+        if reference is None:
+            reference = detected
+        recall = detection_recall(reference, detected)
+        results[detector.name] = {
+            "ms_per_frame": round(1000 * elapsed / len(rgb_frames), 2),
+            "recall": round(recall, 3) if recall is not None else None,
+        }
+
+    # Without a face in view every backend scores perfectly, which would pick the least accurate one
+    if not results or reference is None or not any(reference):
+        return None, results
+
+    eligible = [name for name, r in results.items() if r["recall"] >= accuracy_floor]
+    if not eligible:
+        eligible = list(results)
+    best = min(eligible, key=lambda name: results[name]["ms_per_frame"])
+    return best, results
@@ -0,0 +1,538 @@
+"""
+Background file index for the voice assistant
+Crawls the configured directories once with os.scandir, keeps up to date
+with inotify (or periodic rescans where inotify is unavailable), and answers
+name, extension and modification-time queries from memory
+"""
+
+import bisect
+import ctypes
+import ctypes.util
+import errno
+import json
+import os
+import re
+import select
+import stat
+import struct
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+INDEX_VERSION = 1
+
+# Spoken words for kinds of files
+FILE_KINDS = {
+    "document": {"pdf", "doc", "docx", "odt", "rtf", "txt", "md"},
+    "pdf": {"pdf"},
+    "photo": {"jpg", "jpeg", "png", "gif", "heic", "webp"},
+    "picture": {"jpg", "jpeg", "png", "gif", "heic", "webp"},
+    "image": {"jpg", "jpeg", "png", "gif", "heic", "webp", "svg"},
+    "video": {"mp4", "mkv", "mov", "avi", "webm"},
+    "song": {"mp3", "flac", "wav", "ogg", "m4a"},
+    "music": {"mp3", "flac", "wav", "ogg", "m4a"},
+    "spreadsheet": {"xls", "xlsx", "ods", "csv"},
+    "presentation": {"ppt", "pptx", "odp", "key"},
+    "slides": {"ppt", "pptx", "odp", "key"},
+}
+
+STOP_WORDS = {
+    "find", "locate", "where", "is", "are", "my", "the", "a", "an", "from", "of", "in", "on",
+    "for", "me", "all", "show", "file", "files", "called", "named", "that", "i", "edited",
+    "changed", "modified", "made", "saved", "was", "were", "last", "this", "week", "month",
+    "year", "today", "yesterday", "recent", "recently", "latest", "and", "with", "some",
+}
+
+NAME_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def name_tokens(name):
+    """Lower-case word tokens of a file name, plus the whole stem"""
+    stem = os.path.splitext(name)[0].lower()
+    tokens = set(NAME_TOKEN.findall(stem))
+    tokens.add(stem)
+    return tokens
+
+
+def file_extension(name):
+    return os.path.splitext(name)[1].lower().lstrip(".")
+
+
+def parse_file_query(text, now=None):
+    """Turn a spoken request like "find my report from last week" into search arguments"""
+    now = now or datetime.now()
+    text = text.lower()
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    after = before = None
+
+    if "yesterday" in text:
+        after, before = today - timedelta(days=1), today
+    elif "today" in text:
+        after = today
+    elif "last week" in text:
+        after = today - timedelta(days=today.weekday() + 7)
+    elif "this week" in text:
+        after = today - timedelta(days=today.weekday())
+    elif "last month" in text:
+        first_of_month = today.replace(day=1)
+        after = (first_of_month - timedelta(days=1)).replace(day=1)
+    elif "this month" in text:
+        after = today.replace(day=1)
+    elif "last year" in text:
+        after = today.replace(year=today.year - 1, month=1, day=1)
+    elif "recent" in text or "latest" in text:
+        after = today - timedelta(days=7)
+
+    terms = []
+    extensions = set()
+    for word in NAME_TOKEN.findall(text):
+        kind = FILE_KINDS.get(word) or FILE_KINDS.get(word.rstrip("s"))
+        if kind:
+            extensions |= kind
+        elif word not in STOP_WORDS:
+            terms.append(word)
+
+    return {
+        "terms": terms,
+        "extensions": extensions or None,
+        "modified_after": after.timestamp() if after else None,
+        "modified_before": before.timestamp() if before else None,
+    }
+
+
+class InotifyWatcher:
+    """Minimal inotify binding through ctypes (Linux only)"""
+
+    EVENT_MASK = (0x00000008 | 0x00000040 | 0x00000080 | 0x00000100 | 0x00000200 | 0x00000400 | 0x00000004)
+    # IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_ATTRIB
+    IN_CLOSE_WRITE = 0x00000008
+    IN_ATTRIB = 0x00000004
+    IN_ISDIR = 0x40000000
+    IN_Q_OVERFLOW = 0x00004000
+    IN_NONBLOCK = 0o4000
+    EVENT_HEADER = struct.Struct("iIII")
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(self.IN_NONBLOCK)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths = {}
+
+    @staticmethod
+    def available():
+        return sys.platform.startswith("linux") and ctypes.util.find_library("c") is not None
+
+    def add_watch(self, path):
+        """Watch a directory. Raises OSError, e.g. ENOSPC when the watch limit is reached"""
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), self.EVENT_MASK)
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        self.paths[wd] = path
+        return wd
+
+    def read_events(self, timeout=1.0):
+        """Return (directories whose entries changed, files written or touched in place),
+        or None if events were lost"""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set(), set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set(), set()
+
+        changed_dirs, changed_files = set(), set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = self.EVENT_HEADER.unpack_from(data, offset)
+            start = offset + self.EVENT_HEADER.size
+            name = os.fsdecode(data[start:start + length].rstrip(b"\0"))
+            offset = start + length
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if wd not in self.paths:
+                continue
+            directory = self.paths[wd]
+            # Writes and attribute changes leave the directory's mtime alone, so the file itself is re-read
+            if name and mask & (self.IN_CLOSE_WRITE | self.IN_ATTRIB) and not mask & self.IN_ISDIR:
+                changed_files.add(os.path.join(directory, name))
+            else:
+                changed_dirs.add(directory)
+        return changed_dirs, changed_files
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileIndex:
+    """In-memory index of files under a set of root directories.
+
+    Files are indexed by name token, extension, parent directory and
+    modification time, so lookups never touch the disk. The index is saved
+    to index_path and reloaded on start, so it answers at once while a
+    background rescan catches up with changes made while it was not running.
+    """
+
+    def __init__(self, roots, index_path="file_index.json", poll_interval=300, skip_hidden=True):
+        self.roots = [os.path.abspath(os.path.expanduser(root)) for root in roots]
+        self.index_path = index_path
+        self.poll_interval = poll_interval
+        self.skip_hidden = skip_hidden
+
+        self.entries = {}                   # path -> (mtime, size)
+        self.by_token = defaultdict(set)    # name token -> paths
+        self.by_ext = defaultdict(set)      # extension -> paths
+        self.by_dir = defaultdict(set)      # directory -> file paths
+        self.by_mtime = []                  # (mtime, path), sorted on demand
+        self.mtime_sorted = True
+        self.mtime_removed = set()          # entries removed from by_mtime while it was unsorted
+        self.dir_mtimes = {}                # directory -> mtime when last scanned
+        self.subdirs = {}                   # directory -> child directories
+
+        self.lock = threading.RLock()
+        self.ready = threading.Event()
+        self.running = False
+        self.thread = None
+        self.watcher = None
+        self.watched = set()
+        self.dirty = False
+        self.stats = {"files": 0, "directories": 0, "crawl_seconds": None, "mode": None}
+
+    # Index maintenance
+
+    def _add(self, path, mtime, size):
+        name = os.path.basename(path)
+        self.entries[path] = (mtime, size)
+        for token in name_tokens(name):
+            self.by_token[token].add(path)
+        self.by_ext[file_extension(name)].add(path)
+        self.by_dir[os.path.dirname(path)].add(path)
+        # A crawl appends and sorts once, single updates to a sorted list insert in place
+        item = (mtime, path)
+        if self.mtime_sorted:
+            bisect.insort(self.by_mtime, item)
+        elif item in self.mtime_removed:
+            # The stale copy is still in the list and stands for this one again
+            self.mtime_removed.discard(item)
+        else:
+            self.by_mtime.append(item)
+            self.mtime_sorted = False
+
+    def _sorted_mtimes(self):
+        if not self.mtime_sorted:
+            if self.mtime_removed:
+                removed = self.mtime_removed
+                self.by_mtime = [item for item in self.by_mtime if item not in removed]
+                self.mtime_removed = set()
+            self.by_mtime.sort()
+            self.mtime_sorted = True
+        return self.by_mtime
+
+    def _remove(self, path):
+        mtime, _ = self.entries.pop(path)
+        name = os.path.basename(path)
+        for token in name_tokens(name):
+            self._discard(self.by_token, token, path)
+        self._discard(self.by_ext, file_extension(name), path)
+        self._discard(self.by_dir, os.path.dirname(path), path)
+        if not self.mtime_sorted:
+            # Dropped at the next sort instead of sorting now
+            self.mtime_removed.add((mtime, path))
+            return
+        by_mtime = self.by_mtime
+        i = bisect.bisect_left(by_mtime, (mtime, path))
+        if i < len(by_mtime) and by_mtime[i] == (mtime, path):
+            del by_mtime[i]
+
+    @staticmethod
+    def _discard(index, key, path):
+        paths = index.get(key)
+        if paths is not None:
+            paths.discard(path)
+            if not paths:
+                del index[key]
+
+    def _drop_dir(self, directory):
+        """Forget a directory and everything below it"""
+        for path in list(self.by_dir.get(directory, ())):
+            self._remove(path)
+        for child in self.subdirs.pop(directory, ()):
+            self._drop_dir(child)
+        self.dir_mtimes.pop(directory, None)
+        # The kernel drops the watch of a deleted directory, re-add it if it comes back
+        self.watched.discard(directory)
+
+    def _scan_dir(self, directory):
+        """Re-list one directory and update its files. Returns its subdirectories"""
+        files = {}
+        subdirs = set()
+        try:
+            mtime = os.stat(directory).st_mtime
+            with os.scandir(directory) as it:
+                for entry in it:
+                    if self.skip_hidden and entry.name.startswith("."):
+                        continue
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.add(entry.path)
+                        elif entry.is_file(follow_symlinks=False):
+                            st = entry.stat(follow_symlinks=False)
+                            files[entry.path] = (st.st_mtime, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            with self.lock:
+                self._drop_dir(directory)
+            return set()
+
+        with self.lock:
+            for path in self.by_dir.get(directory, set()) - files.keys():
+                self._remove(path)
+            for path, (file_mtime, size) in files.items():
+                if self.entries.get(path) != (file_mtime, size):
+                    if path in self.entries:
+                        self._remove(path)
+                    self._add(path, file_mtime, size)
+            for child in self.subdirs.get(directory, set()) - subdirs:
+                self._drop_dir(child)
+            self.subdirs[directory] = subdirs
+            self.dir_mtimes[directory] = mtime
+            self.dirty = True
+        return subdirs
+
+    def sync(self, directories=None, rescan=False):
+        """Bring the index up to date, rescanning directories whose mtime changed.
+
+        A directory's mtime does not change when a file in it is edited in place,
+        so rescan=True re-lists the given directories (every directory without
+        directories) regardless; their subdirectories are still checked by mtime.
+        """
+        stack = list(directories or self.roots)
+        forced = set(stack) if rescan else set()
+        everything = rescan and directories is None
+        seen = set()
+        while stack:
+            directory = stack.pop()
+            if directory in seen:
+                continue
+            seen.add(directory)
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                with self.lock:
+                    self._drop_dir(directory)
+                continue
+
+            if everything or directory in forced or self.dir_mtimes.get(directory) != mtime:
+                subdirs = self._scan_dir(directory)
+                if self.watcher is not None and directory not in self.watched:
+                    self._watch(directory)
+            else:
+                subdirs = self.subdirs.get(directory, set())
+            stack.extend(subdirs)
+
+        if directories is None:
+            # A full sync also forgets directories that disappeared while we were not running
+            with self.lock:
+                for directory in set(self.dir_mtimes) - seen:
+                    self._drop_dir(directory)
+        return seen
+
+    def refresh_files(self, paths):
+        """Re-read the mtime and size of files changed in place"""
+        with self.lock:
+            for path in paths:
+                if os.path.dirname(path) not in self.dir_mtimes:
+                    continue
+                if self.skip_hidden and os.path.basename(path).startswith("."):
+                    continue
+                try:
+                    st = os.stat(path, follow_symlinks=False)
+                except OSError:
+                    if path in self.entries:
+                        self._remove(path)
+                        self.dirty = True
+                    continue
+                if not stat.S_ISREG(st.st_mode) or self.entries.get(path) == (st.st_mtime, st.st_size):
+                    continue
+                if path in self.entries:
+                    self._remove(path)
+                self._add(path, st.st_mtime, st.st_size)
+                self.dirty = True
+
+    # Persistence
+
+    def load(self):
+        """Load a saved index. Returns False if there is none or it is for other roots"""
+        try:
+            with open(self.index_path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if data.get("version") != INDEX_VERSION or data.get("roots") != self.roots:
+            return False
+
+        with self.lock:
+            for path, mtime, size in data["files"]:
+                self._add(path, mtime, size)
+            for directory, (mtime, subdirs) in data["directories"].items():
+                self.dir_mtimes[directory] = mtime
+                self.subdirs[directory] = set(subdirs)
+            self.dirty = False
+        return True
+
+    def save(self):
+        """Write the index to disk"""
+        with self.lock:
+            data = {
+                "version": INDEX_VERSION,
+                "roots": self.roots,
+                "files": [[path, mtime, size] for path, (mtime, size) in self.entries.items()],
+                "directories": {d: [mtime, sorted(self.subdirs.get(d, ()))] for d, mtime in self.dir_mtimes.items()},
+            }
+            self.dirty = False
+        temp_path = self.index_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(temp_path, self.index_path)
+
+    # Background thread
+
+    def start(self):
+        """Load or build the index and keep it updated on a background thread"""
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="file-indexer", daemon=True)
+        self.thread.start()
+        return self
+
+    def _watch(self, directory):
+        try:
+            self.watcher.add_watch(directory)
+            self.watched.add(directory)
+        except OSError as e:
+            if e.errno == errno.ENOSPC:
+                print("File index: inotify watch limit reached, falling back to periodic rescans")
+                self.watcher.close()
+                self.watcher = None
+                self.stats["mode"] = "polling"
+
+    def _run(self):
+        if self.load():
+            print(f"File index: loaded {len(self.entries)} files from {self.index_path}")
+        if InotifyWatcher.available():
+            try:
+                self.watcher = InotifyWatcher()
+                self.stats["mode"] = "inotify"
+                # Every known directory needs a watch, not only the ones sync rescans
+                for directory in list(self.dir_mtimes):
+                    if self.watcher is not None:
+                        self._watch(directory)
+            except OSError as e:
+                print(f"File index: inotify unavailable ({e}), falling back to periodic rescans")
+                self.watcher = None
+        if self.watcher is None:
+            self.stats["mode"] = "polling"
+
+        start = time.perf_counter()
+        # Files edited while we were not running only show up in a full rescan
+        self.sync(rescan=True)
+        self.stats["crawl_seconds"] = round(time.perf_counter() - start, 2)
+        self.ready.set()
+        self.save()
+
+        last_save = last_poll = time.time()
+        while self.running:
+            if self.watcher is not None:
+                changes = self.watcher.read_events(timeout=1.0)
+                if changes is None:
+                    # Kernel queue overflowed, nothing tells us what changed
+                    self.sync(rescan=True)
+                else:
+                    changed_dirs, changed_files = changes
+                    if changed_dirs:
+                        self.sync(changed_dirs, rescan=True)
+                    if changed_files:
+                        self.refresh_files(changed_files)
+            else:
+                time.sleep(1.0)
+                if time.time() - last_poll >= self.poll_interval:
+                    self.sync(rescan=True)
+                    last_poll = time.time()
+
+            if self.dirty and time.time() - last_save >= 60:
+                self.save()
+                last_save = time.time()
+
+    def stop(self):
+        """Stop watching and save the index"""
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+        if self.watcher is not None:
+            self.watcher.close()
+            self.watcher = None
+        if self.dirty:
+            self.save()
+
+    # Queries
+
+    def search(self, terms=(), extensions=None, modified_after=None, modified_before=None, limit=10):
+        """Find files matching every name term, newest first"""
+        with self.lock:
+            candidates = None
+            for term in terms:
+                matches = self.by_token.get(term) or self.by_token.get(term.rstrip("s"), set())
+                candidates = set(matches) if candidates is None else candidates & matches
+                if not candidates:
+                    return []
+
+            if extensions:
+                matches = set().union(*(self.by_ext.get(ext, ()) for ext in extensions))
+                candidates = matches if candidates is None else candidates & matches
+
+            if candidates is None:
+                # No name or kind given: walk the mtime index from the newest end
+                by_mtime = self._sorted_mtimes()
+                low = bisect.bisect_left(by_mtime, (modified_after,)) if modified_after else 0
+                high = bisect.bisect_left(by_mtime, (modified_before,)) if modified_before else len(by_mtime)
+                return [path for _, path in reversed(by_mtime[max(low, high - limit):high])]
+
+            results = []
+            for path in candidates:
+                mtime = self.entries[path][0]
+                if modified_after and mtime < modified_after:
+                    continue
+                if modified_before and mtime >= modified_before:
+                    continue
+                results.append((mtime, path))
+        results.sort(reverse=True)
+        return [path for _, path in results[:limit]]
+
+    def query(self, text, limit=10):
+        """Answer a spoken file request"""
+        return self.search(limit=limit, **parse_file_query(text))
+
+    def list_directory(self, directory):
+        """Names in an indexed directory, or None if it is not indexed"""
+        directory = os.path.abspath(directory)
+        with self.lock:
+            if directory not in self.dir_mtimes:
+                return None
+            names = [os.path.basename(p) for p in self.by_dir.get(directory, ())]
+            names += [os.path.basename(p) + "/" for p in self.subdirs.get(directory, ())]
+        return sorted(names, key=str.lower)
+
+    def modified_time(self, path):
+        with self.lock:
+            entry = self.entries.get(path)
+        return entry[0] if entry else None
+
+    def snapshot(self):
+        """Index size and update mode as a plain dict"""
+        with self.lock:
+            return dict(self.stats, files=len(self.entries), directories=len(self.dir_mtimes), ready=self.ready.is_set())
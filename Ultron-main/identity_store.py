@@ -0,0 +1,47 @@
+"""
+Shared identity store for the voice assistant
+Holds the known face gallery and fuses sightings from every camera
+"""
+
+import threading
+import time
+
+from startup import LazyModule
+
+face_recognition = LazyModule("face_recognition")
+
+
+class IdentityStore:
+    """Known faces plus the latest sighting of each identity across cameras"""
+
+    def __init__(self, tolerance=0.6):
+        self.tolerance = tolerance
+        self.known_face_encodings = []
+        self.known_face_names = []
+        self.sightings = {}
+        self.lock = threading.Lock()
+
+    def add(self, name, encoding):
+        """Add a known face"""
+        with self.lock:
+            self.known_face_encodings.append(encoding)
+            self.known_face_names.append(name)
+
+    def match(self, face_encoding):
+        """Return the name of the first known face matching the encoding, or Unknown"""
+        matches = face_recognition.compare_faces(self.known_face_encodings, face_encoding, tolerance=self.tolerance)
+        if True in matches:
+            return self.known_face_names[matches.index(True)]
+        return "Unknown"
+
+    def observe(self, name, camera_id):
+        """Record a sighting. Returns True if this is the first sighting of name on any camera"""
+        with self.lock:
+            first = name not in self.sightings
+            self.sightings[name] = {"camera": camera_id, "time": time.time()}
+            return first
+
+    def last_seen(self, name):
+        """Return the latest sighting of name as {"camera", "time"}, or None"""
+        with self.lock:
+            return self.sightings.get(name)
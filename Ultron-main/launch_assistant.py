@@ -7,6 +7,11 @@ Provides a menu to choose between different options
 import os
 import sys
 import subprocess
+import importlib.util
+import json
+import socket
+
+from assistant_daemon import DAEMON_LOG, AssistantClient, daemon_running, wait_for_daemon
 
 def clear_screen():
     """Clear the terminal screen"""
@@ -20,15 +25,10 @@ def print_banner():
 
 def check_dependencies():
     """Check if dependencies are installed"""
-    try:
-        import cv2
-        import face_recognition
-        import speech_recognition
-        import pyttsx3
-        import numpy
-        return True
-    except ImportError:
-        return False
+    # find_spec locates packages without importing them, which for
+    # face_recognition would mean loading the dlib models just to show a menu
+    modules = ["cv2", "face_recognition", "speech_recognition", "pyttsx3", "numpy"]
+    return all(importlib.util.find_spec(module) is not None for module in modules)
 
 def install_dependencies():
     """Install required dependencies"""
@@ -60,8 +60,69 @@ def register_face():
         print(f"❌ Failed to launch face registration: {e}")
         return False
 
+def attach_to_daemon():
+    """Send text commands to the running assistant daemon"""
+    print("🔗 Connected to the assistant daemon.")
+    print("Type a command, 'presence' or 'metrics'. Press Enter on an empty line to detach.")
+    try:
+        with AssistantClient() as client:
+            while True:
+                text = input("> ").strip()
+                if not text:
+                    break
+                if text == "presence":
+                    print(json.dumps(client.presence(), indent=2, default=str))
+                elif text == "metrics":
+                    print(json.dumps(client.metrics(), indent=2, default=str))
+                else:
+                    response = client.command(text)
+                    if not response.get("ok"):
+                        print(f"❌ {response.get('error')}")
+                        continue
+                    for line in response["responses"]:
+                        print(f"Assistant: {line}")
+                    if not response["continue"]:
+                        print("👋 The assistant has exited.")
+                        break
+        return True
+    except (OSError, ValueError) as e:
+        print(f"❌ Lost connection to the assistant daemon: {e}")
+        return False
+
+def launch_daemon():
+    """Start the advanced assistant daemon in the background, or reuse a running one"""
+    if daemon_running():
+        return True
+    print("🚀 Starting advanced voice assistant daemon...")
+    try:
+        # Logs go to a file, otherwise they would interleave with the attached prompt
+        with open(DAEMON_LOG, "a") as log:
+            subprocess.Popen([sys.executable, "-u", "assistant_daemon.py"], start_new_session=True,
+                             stdin=subprocess.DEVNULL, stdout=log, stderr=subprocess.STDOUT)
+    except Exception as e:
+        print(f"❌ Failed to start assistant daemon: {e}")
+        return False
+    if not wait_for_daemon():
+        print(f"❌ The assistant daemon did not come up. See {DAEMON_LOG} for why.")
+        return False
+    return True
+
+def stop_daemon():
+    """Stop the running assistant daemon"""
+    if not daemon_running():
+        print("ℹ️  No assistant daemon is running.")
+        return False
+    with AssistantClient() as client:
+        client.shutdown()
+    print("🛑 Assistant daemon stopped.")
+    return True
+
 def launch_assistant(version="advanced"):
     """Launch the voice assistant"""
+    # The advanced assistant stays warm in a daemon, later launches just attach to it
+    if version == "advanced" and hasattr(socket, "AF_UNIX"):
+        return launch_daemon() and attach_to_daemon()
+    
     script_name = f"{version}_voice_assistant.py"
     if not os.path.exists(script_name):
         script_name = "voice_assistant.py"
@@ -97,10 +158,11 @@ def show_menu():
         print("4. 🚀 Launch Basic Voice Assistant")
         print("5. 🚀 Launch Advanced Voice Assistant")
         print("6. 📖 View README")
-        print("7. ❌ Exit")
+        print("7. 🛑 Stop Assistant Daemon")
+        print("8. ❌ Exit")
         print()
         
-        choice = input("Enter your choice (1-7): ").strip()
+        choice = input("Enter your choice (1-8): ").strip()
         
         if choice == "1":
             run_tests()
@@ -128,6 +190,7 @@ def show_menu():
         elif choice == "5":
             if check_face_registration():
                 launch_assistant("advanced")
+                input("\nPress Enter to continue...")
             else:
                 print("❌ No face registered! Please register your face first.")
                 input("\nPress Enter to continue...")
@@ -143,6 +206,10 @@ def show_menu():
             input("\nPress Enter to continue...")
             
         elif choice == "7":
+            stop_daemon()
+            input("\nPress Enter to continue...")
+            
+        elif choice == "8":
             print("👋 Goodbye!")
             break
             
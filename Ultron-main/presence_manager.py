@@ -0,0 +1,134 @@
+"""
+Presence tracking for the voice assistant
+Debounces master identification and decides how much recognition work to do
+"""
+
+import threading
+import time
+from collections import defaultdict, deque
+
+from startup import LazyModule
+
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+
+# Presence states, each with its own recognition mode
+SEARCHING = "searching"  # master not identified: full recognition on every frame
+PRESENT = "present"      # master identified: low-rate re-verification
+IDLE = "idle"            # nobody around: motion detection only
+
+
+class PresenceManager:
+    """State machine for master presence.
+
+    Identity is declared only after required_matches of the last window
+    recognition results of one camera saw the master. Each camera votes on
+    its own, so a camera that cannot see the master never outvotes one that
+    can. The session expires when the master has not been seen for
+    session_timeout seconds, and the assistant idles when nothing has been
+    seen for idle_after seconds while searching.
+    """
+
+    def __init__(self, required_matches=3, window=5, session_timeout=30.0, reverify_interval=2.0, idle_after=15.0):
+        self.required_matches = required_matches
+        self.session_timeout = session_timeout
+        self.reverify_interval = reverify_interval
+        self.idle_after = idle_after
+
+        self.state = SEARCHING
+        self.window = window
+        self.votes = defaultdict(lambda: deque(maxlen=self.window))
+        self.last_seen = None
+        self.last_activity = time.time()
+        self.last_verified = {}
+        self.lock = threading.Lock()
+
+    @property
+    def is_present(self):
+        return self.state == PRESENT
+
+    def _set_state(self, state):
+        if state == self.state:
+            return None
+        self.state = state
+        self.votes.clear()
+        self.last_verified.clear()
+        return state
+
+    def observe(self, master_seen, face_seen=False, camera_id=0, now=None):
+        """Record one recognition result of a camera.
+
+        Returns the new state on a transition, else None.
+        """
+        now = now or time.time()
+        with self.lock:
+            votes = self.votes[camera_id]
+            votes.append(bool(master_seen))
+            if master_seen:
+                self.last_seen = now
+            if master_seen or face_seen:
+                self.last_activity = now
+
+            if self.state != PRESENT and sum(votes) >= self.required_matches:
+                return self._set_state(PRESENT)
+            return None
+
+    def on_motion(self, now=None):
+        """Wake up from idle when a camera sees motion"""
+        with self.lock:
+            self.last_activity = now or time.time()
+            if self.state == IDLE:
+                return self._set_state(SEARCHING)
+            return None
+
+    def update(self, now=None):
+        """Apply timeouts. Returns the new state on a transition, else None"""
+        now = now or time.time()
+        with self.lock:
+            if self.state == PRESENT and now - (self.last_seen or 0) > self.session_timeout:
+                return self._set_state(IDLE)
+            if self.state == SEARCHING and now - self.last_activity > self.idle_after:
+                return self._set_state(IDLE)
+            return None
+
+    def should_recognize(self, camera_id, now=None):
+        """Whether a camera should run face recognition on its next frame"""
+        now = now or time.time()
+        with self.lock:
+            if self.state == SEARCHING:
+                return True
+            if self.state == PRESENT:
+                if now - self.last_verified.get(camera_id, 0) >= self.reverify_interval:
+                    self.last_verified[camera_id] = now
+                    return True
+            return False
+
+    def snapshot(self):
+        """Current presence as a plain dict"""
+        with self.lock:
+            return {
+                "state": self.state,
+                "votes": {camera_id: sum(votes) for camera_id, votes in self.votes.items()},
+                "last_seen": self.last_seen,
+                "seconds_since_seen": round(time.time() - self.last_seen, 1) if self.last_seen else None,
+            }
+
+
+class MotionDetector:
+    """Cheap frame-differencing motion check on a tiny grayscale thumbnail"""
+
+    def __init__(self, threshold=0.02, pixel_delta=25, size=(64, 48)):
+        self.threshold = threshold
+        self.pixel_delta = pixel_delta
+        self.size = size
+        self.previous = None
+
+    def detect(self, frame):
+        """Return True if the fraction of changed pixels exceeds the threshold"""
+        gray = cv2.cvtColor(cv2.resize(frame, self.size), cv2.COLOR_BGR2GRAY)
+        gray = cv2.GaussianBlur(gray, (5, 5), 0)
+        previous, self.previous = self.previous, gray
+        if previous is None:
+            return False
+        changed = np.count_nonzero(cv2.absdiff(gray, previous) > self.pixel_delta)
+        return changed / float(gray.size) >= self.threshold
@@ -0,0 +1,166 @@
+"""
+CPU and thread governor for the voice assistant
+Keeps the assistant within a CPU budget on machines shared with other services
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import deque
+
+from startup import LazyModule
+
+cv2 = LazyModule("cv2")
+
+# Thread pool sizes read by OpenMP, OpenBLAS, MKL, Accelerate and numexpr at import time
+THREAD_ENV_VARS = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS",
+                   "VECLIB_MAXIMUM_THREADS", "NUMEXPR_NUM_THREADS"]
+
+
+def thread_ids():
+    """Native ids of all our threads. Linux applies niceness per thread, elsewhere 0 means the process"""
+    try:
+        return [int(tid) for tid in os.listdir("/proc/self/task")]
+    except OSError:
+        return [0]
+
+
+def limit_library_threads(max_threads):
+    """Cap native thread pools. Only effective before numpy, cv2 and dlib are imported"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(max_threads)
+
+
+class ResourceGovernor:
+    """Paces the capture loop and adapts its frame rate to a CPU budget.
+
+    cpu_budget is measured in cores (1.0 = one full core). Once a second the
+    process CPU usage is compared with the budget: over budget the frame rate
+    drops proportionally (never below min_fps), comfortably under it the rate
+    climbs back towards target_fps. Every change is recorded as a decision.
+    """
+
+    def __init__(self, cpu_budget=1.0, max_threads=2, target_fps=15, min_fps=2, idle_niceness=10, interval=1.0):
+        self.cpu_budget = cpu_budget
+        self.max_threads = max_threads
+        self.target_fps = target_fps
+        self.min_fps = min_fps
+        self.idle_niceness = idle_niceness
+        self.interval = interval
+
+        self.effective_fps = float(target_fps)
+        self.cpu_usage = 0.0
+        self.idle = False
+        self.niceness = os.getpriority(os.PRIO_PROCESS, 0) if hasattr(os, "getpriority") else None
+        self.base_niceness = self.niceness
+        self.can_restore = self.niceness is not None and self.priority_restorable(self.base_niceness)
+
+        self.next_frame = time.perf_counter()
+        self.sample_wall = time.perf_counter()
+        self.sample_cpu = time.process_time()
+        self.decisions = deque(maxlen=50)
+        self.lock = threading.Lock()
+
+    def record(self, decision):
+        with self.lock:
+            self.decisions.append({"time": round(time.time(), 1), "decision": decision})
+        print(f"Resource governor: {decision}")
+
+    def apply_thread_limits(self):
+        """Cap OpenCV's own thread pool, call once cv2 is available"""
+        cv2.setNumThreads(self.max_threads)
+        self.record(f"capped OpenCV and BLAS threads at {self.max_threads}")
+
+    def frame_delay(self):
+        """Seconds to wait before the next frame, and book that frame slot"""
+        self.update()
+        now = time.perf_counter()
+        period = 1.0 / self.effective_fps
+        # Do not try to catch up on missed slots, that would just burst
+        self.next_frame = max(self.next_frame + period, now)
+        return max(0.0, self.next_frame - now)
+
+    def update(self):
+        """Compare recent CPU usage with the budget and adjust the frame rate"""
+        wall = time.perf_counter()
+        if wall - self.sample_wall < self.interval:
+            return
+        cpu = time.process_time()
+        self.cpu_usage = (cpu - self.sample_cpu) / (wall - self.sample_wall)
+        self.sample_wall, self.sample_cpu = wall, cpu
+
+        fps = self.effective_fps
+        if self.cpu_usage > self.cpu_budget:
+            fps = max(self.min_fps, fps * self.cpu_budget / self.cpu_usage * 0.9)
+        elif self.cpu_usage < 0.7 * self.cpu_budget and fps < self.target_fps:
+            fps = min(self.target_fps, fps * 1.25)
+
+        if abs(fps - self.effective_fps) >= 0.5:
+            self.record(f"CPU {self.cpu_usage:.2f} of {self.cpu_budget:.2f} cores, "
+                        f"frame rate {self.effective_fps:.1f} -> {fps:.1f} fps")
+            self.effective_fps = fps
+
+    @staticmethod
+    def priority_restorable(niceness):
+        """Whether this process may raise its priority back to niceness after lowering it"""
+        if hasattr(os, "geteuid") and os.geteuid() == 0:
+            return True
+        if not sys.platform.startswith("linux"):
+            return False
+        try:
+            with open("/proc/self/status") as f:
+                caps = next((line.split()[1] for line in f if line.startswith("CapEff:")), "0")
+            if int(caps, 16) & (1 << 23):  # CAP_SYS_NICE
+                return True
+        except OSError:
+            pass
+        import resource
+        # RLIMIT_NICE allows niceness down to 20 - limit without CAP_SYS_NICE
+        limit = resource.getrlimit(resource.RLIMIT_NICE)[0]
+        return limit == resource.RLIM_INFINITY or niceness >= 20 - limit
+
+    def set_idle(self, idle):
+        """Lower process priority while nobody is around, and restore it afterwards.
+
+        Unprivileged processes cannot raise their priority again, so when that
+        is not allowed the priority is left alone instead of staying low forever.
+        """
+        if idle == self.idle:
+            return
+        self.idle = idle
+        if self.niceness is None:
+            return
+        if not self.can_restore:
+            if idle:
+                self.record(f"idle, keeping niceness {self.base_niceness} (it could not be restored afterwards)")
+            return
+
+        wanted = self.base_niceness + self.idle_niceness if idle else self.base_niceness
+        try:
+            # Capture, recognition and indexing threads all have their own niceness
+            for tid in thread_ids():
+                try:
+                    os.setpriority(os.PRIO_PROCESS, tid, wanted)
+                except ProcessLookupError:
+                    pass  # the thread has exited since we listed it
+            self.niceness = wanted
+            self.record(f"{'idle' if idle else 'active'}, niceness set to {wanted}")
+        except PermissionError:
+            # Raising priority again needs CAP_SYS_NICE or a RLIMIT_NICE allowance
+            self.record(f"active, could not restore niceness {self.base_niceness} (staying at {self.niceness})")
+
+    def snapshot(self):
+        """Current budget, usage and recent decisions as a plain dict"""
+        with self.lock:
+            decisions = list(self.decisions)[-10:]
+        return {
+            "cpu_budget": self.cpu_budget,
+            "cpu_usage": round(self.cpu_usage, 2),
+            "target_fps": self.target_fps,
+            "effective_fps": round(self.effective_fps, 1),
+            "max_threads": self.max_threads,
+            "idle": self.idle,
+            "niceness": self.niceness,
+            "decisions": decisions,
+        }
@@ -0,0 +1,147 @@
+"""
+Speculative command execution for the voice assistant
+Prepares answers to side-effect-free commands from an interim transcript,
+while the final transcript is still being recognized
+"""
+
+import os
+import platform
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+# Commands that only answer a question. Nothing else is ever run speculatively,
+# in particular shutdown, restart, open and exit must wait for the final transcript.
+SPECULATIVE_INTENTS = frozenset({"greeting", "time", "date", "system_info", "help"})
+
+
+class PreparedResponse:
+    """An answer computed ahead of the final transcript"""
+
+    def __init__(self, intent, text, audio_path=None):
+        self.intent = intent
+        self.text = text
+        self.audio_path = audio_path
+        self.prepared_at = time.perf_counter()
+
+
+class SpeculativeExecutor:
+    """Prepares responses from interim transcripts and commits them on confirmation.
+
+    classify maps a transcript to an intent name, respond builds the response
+    text for an intent, and render (optional) turns text into an audio file.
+    A prepared response is only used if the final transcript has the same
+    intent and the response text is unchanged (e.g. the minute has not ticked over).
+    """
+
+    def __init__(self, classify, respond, render=None):
+        self.classify = classify
+        self.respond = respond
+        self.render = render
+        self.prepared = None
+        self.lock = threading.Lock()
+        self.stats = {"prepared": 0, "hits": 0, "misses": 0, "render_ms": 0.0}
+
+    def on_partial(self, transcript):
+        """Classify an interim transcript and prepare its response if that is safe"""
+        intent = self.classify(transcript)
+        if intent not in SPECULATIVE_INTENTS:
+            return None
+        with self.lock:
+            if self.prepared is not None and self.prepared.intent == intent:
+                return self.prepared
+
+        text = self.respond(intent)
+        audio_path = None
+        if self.render is not None:
+            start = time.perf_counter()
+            audio_path = self.render(text)
+            self.stats["render_ms"] += (time.perf_counter() - start) * 1000
+
+        prepared = PreparedResponse(intent, text, audio_path)
+        with self.lock:
+            self.discard()
+            self.prepared = prepared
+            self.stats["prepared"] += 1
+        return prepared
+
+    def commit(self, transcript):
+        """Return the prepared response if the final transcript confirms it, else None"""
+        with self.lock:
+            prepared, self.prepared = self.prepared, None
+        if prepared is None:
+            return None
+
+        intent = self.classify(transcript)
+        if intent == prepared.intent and self.respond(intent) == prepared.text:
+            self.stats["hits"] += 1
+            return prepared
+
+        self.stats["misses"] += 1
+        self._remove_audio(prepared)
+        return None
+
+    def discard(self):
+        """Drop any prepared response, e.g. when recognition failed"""
+        prepared, self.prepared = self.prepared, None
+        if prepared is not None:
+            self._remove_audio(prepared)
+
+    @staticmethod
+    def _remove_audio(prepared):
+        if prepared.audio_path and os.path.exists(prepared.audio_path):
+            os.remove(prepared.audio_path)
+
+
+class SpeechRenderer:
+    """Renders speech to WAV files with pyttsx3 and plays them back"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.directory = tempfile.mkdtemp(prefix="assistant-speech-")
+        self.count = 0
+        self.player = self.find_player()
+
+    @staticmethod
+    def find_player():
+        """Command that plays a WAV file on this platform, None to use winsound or nothing"""
+        system = platform.system()
+        if system == "Windows":
+            return None
+        for command in (["afplay"], ["paplay"], ["aplay", "-q"]):
+            if shutil.which(command[0]):
+                return command
+        return None
+
+    @property
+    def available(self):
+        return self.player is not None or platform.system() == "Windows"
+
+    def render(self, text):
+        """Synthesize text into a WAV file and return its path"""
+        self.count += 1
+        path = os.path.join(self.directory, f"speech-{self.count}.wav")
+        self.engine.save_to_file(text, path)
+        self.engine.runAndWait()
+        return path if os.path.exists(path) else None
+
+    def play(self, path):
+        """Play a rendered file, returns False if it could not be played"""
+        try:
+            if platform.system() == "Windows":
+                import winsound
+                winsound.PlaySound(path, winsound.SND_FILENAME)
+            else:
+                subprocess.run(self.player + [path], check=True,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            return True
+        except Exception:
+            return False
+        finally:
+            if os.path.exists(path):
+                os.remove(path)
+
+    def cleanup(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
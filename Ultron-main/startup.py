@@ -0,0 +1,102 @@
+"""
+Startup helpers for the voice assistant
+Lazy module loading and per-phase startup timing
+"""
+
+import importlib
+import threading
+import time
+from contextlib import contextmanager
+
+
+class LazyModule:
+    """Stand-in for a module that is imported on first attribute access.
+
+    Use it in place of a heavy top-level import, e.g. cv2 = LazyModule("cv2"),
+    and call preload() to start the import on a background thread.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def preload(self):
+        """Import the module on a background thread"""
+        thread = threading.Thread(target=self._safe_load, name=f"import-{self._name}", daemon=True)
+        thread.start()
+        return thread
+
+    def _safe_load(self):
+        try:
+            self._load()
+        except ImportError as e:
+            # The real error surfaces again on first use
+            print(f"Could not preload {self._name}: {e}")
+
+
+class StartupTimer:
+    """Records how long each startup phase took, relative to process start"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases = {}
+        self.milestones = {}
+        self.lock = threading.Lock()
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of startup work"""
+        begin = self.elapsed_ms()
+        try:
+            yield
+        finally:
+            with self.lock:
+                self.phases[name] = (begin, self.elapsed_ms() - begin)
+
+    def timed(self, name, func, *args, **kwargs):
+        """Run func inside a phase, handy for submitting to a thread pool"""
+        with self.phase(name):
+            return func(*args, **kwargs)
+
+    def mark(self, name):
+        """Record a milestone once, e.g. the first camera frame shown"""
+        with self.lock:
+            self.milestones.setdefault(name, self.elapsed_ms())
+
+    def reached(self, name):
+        """Whether a milestone has been recorded"""
+        with self.lock:
+            return name in self.milestones
+
+    def as_dict(self):
+        with self.lock:
+            return {
+                "phases": {name: {"start_ms": round(begin, 1), "duration_ms": round(duration, 1)}
+                           for name, (begin, duration) in self.phases.items()},
+                "milestones": {name: round(at, 1) for name, at in self.milestones.items()},
+            }
+
+    def report(self):
+        """Print the startup breakdown"""
+        with self.lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1][0])
+            milestones = sorted(self.milestones.items(), key=lambda item: item[1])
+        print("Startup time by phase:")
+        for name, (begin, duration) in phases:
+            print(f"  {name:<20} {begin:8.0f} ms -> {begin + duration:8.0f} ms  ({duration:.0f} ms)")
+        for name, at in milestones:
+            print(f"  {name:<20} {at:8.0f} ms")
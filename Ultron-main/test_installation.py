@@ -40,6 +40,25 @@ def test_camera():
         print(f"   Error: {e}")
         return False
 
+def test_daemon():
+    """Check the running assistant daemon instead of cold-starting hardware it already holds"""
+    try:
+        from assistant_daemon import AssistantClient
+        with AssistantClient(timeout=5.0) as client:
+            metrics = client.metrics()
+        cameras = metrics.get("cameras", [])
+        running = [camera for camera in cameras if camera["running"]]
+        print(f"✅ Assistant daemon - OK (presence: {metrics.get('presence')})")
+        if running:
+            print(f"✅ Camera - OK ({len(running)} of {len(cameras)} in use by the daemon)")
+            return True
+        print("❌ Camera - FAILED (daemon has no running camera)")
+        return False
+    except Exception as e:
+        print(f"❌ Assistant daemon - FAILED")
+        print(f"   Error: {e}")
+        return False
+
 def test_microphone():
     """Test microphone access"""
     try:
@@ -109,7 +128,12 @@ def main():
     print("🔧 Testing Hardware Access")
     print("-" * 30)
     
-    if not test_camera():
+    # A running daemon holds the camera, so ask it instead of opening the device
+    from assistant_daemon import daemon_running
+    if daemon_running():
+        if not test_daemon():
+            all_passed = False
+    elif not test_camera():
         all_passed = False
         
     if not test_microphone():
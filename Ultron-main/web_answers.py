@@ -0,0 +1,237 @@
+"""
+Spoken web answers for the voice assistant
+Asks several answer endpoints at once over a shared connection pool and
+keeps the answers in a TTL + LRU cache that survives restarts
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from urllib.parse import quote, quote_plus
+
+from startup import LazyModule
+
+requests = LazyModule("requests")
+
+CACHE_VERSION = 1
+
+# Tried in this order, the first one with an answer wins. {query} is the URL-encoded
+# question, {title} the question as a Wikipedia page title. field is a dotted path
+# into the JSON response.
+DEFAULT_ENDPOINTS = [
+    {"name": "duckduckgo", "field": "AbstractText",
+     "url": "https://api.duckduckgo.com/?q={query}&format=json&no_html=1&skip_disambig=1"},
+    {"name": "wikipedia", "field": "extract",
+     "url": "https://en.wikipedia.org/api/rest_v1/page/summary/{title}"},
+]
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def first_sentences(text, count=2):
+    """Shorten an answer to something reasonable to speak"""
+    return " ".join(SENTENCE_END.split(text.strip())[:count])
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class AnswerCache:
+    """Answers by normalized query, expiring after ttl seconds, least recently used evicted first"""
+
+    def __init__(self, path=None, ttl=86400, max_entries=500, save_every=10, save_interval=60.0):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.save_every = save_every
+        self.save_interval = save_interval
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.dirty = False
+        self.unsaved = 0
+        self.last_save = time.time()
+
+    def get(self, key):
+        """Cached entry for key, or None if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            if entry["expires"] < time.time():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, answer, source):
+        with self.lock:
+            self.entries[key] = {"answer": answer, "source": source, "expires": time.time() + self.ttl}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            self.dirty = True
+            self.unsaved += 1
+        # Saved as it goes, a killed daemon should not lose the whole cache
+        if self.unsaved >= self.save_every or time.time() - self.last_save >= self.save_interval:
+            self.save()
+
+    def load(self):
+        """Read unexpired entries from disk, oldest use first"""
+        if not self.path:
+            return
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        now = time.time()
+        with self.lock:
+            for key, entry in data["entries"]:
+                if entry["expires"] > now:
+                    self.entries[key] = entry
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        with self.save_lock:
+            with self.lock:
+                data = {"version": CACHE_VERSION, "entries": list(self.entries.items())}
+                self.dirty = False
+                self.unsaved = 0
+                self.last_save = time.time()
+            try:
+                # Written to a temporary file first so a crash never leaves a truncated cache
+                with open(self.path + ".tmp", "w") as f:
+                    json.dump(data, f)
+                os.replace(self.path + ".tmp", self.path)
+            except OSError as e:
+                print(f"Could not save web answer cache: {e}")
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class WebAnswers:
+    """Fetches short answers to spoken questions.
+
+    All endpoints are queried concurrently through one requests.Session, so
+    connections are reused between questions. The answer of the highest
+    priority endpoint is used as soon as it and every endpoint before it
+    have responded; the rest finish in the background.
+    """
+
+    def __init__(self, endpoints=None, timeout=3.0, cache_path="web_answer_cache.json",
+                 cache_ttl=86400, cache_size=500):
+        self.endpoints = endpoints or DEFAULT_ENDPOINTS
+        self.timeout = timeout
+        self.cache = AnswerCache(cache_path, cache_ttl, cache_size)
+        self.cache.load()
+        # Room for a second question while the slow endpoints of the first finish
+        self.workers = 2 * len(self.endpoints)
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="web-answers")
+        self.session = None
+        self.session_lock = threading.Lock()
+
+        self.stats = {"requests": 0, "cache_hits": 0, "fetches": 0, "answered": 0, "errors": 0}
+        self.fetch_latencies = deque(maxlen=500)
+        self.lock = threading.Lock()
+
+    def get_session(self):
+        """Shared session, created on first use so startup does not import requests"""
+        with self.session_lock:
+            if self.session is None:
+                session = requests.Session()
+                adapter = requests.adapters.HTTPAdapter(pool_connections=len(self.endpoints),
+                                                        pool_maxsize=self.workers)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                session.headers["User-Agent"] = "UltronVoiceAssistant/1.0"
+                self.session = session
+            return self.session
+
+    @staticmethod
+    def normalize(query):
+        return " ".join(query.lower().split())
+
+    def fetch(self, endpoint, query):
+        """Answer text from one endpoint, "" if it has none. Raises on network errors"""
+        url = endpoint["url"].format(query=quote_plus(query),
+                                     title=quote(query[:1].upper() + query[1:].replace(" ", "_")))
+        response = self.get_session().get(url, timeout=self.timeout)
+        if response.status_code == 404:
+            return ""
+        response.raise_for_status()
+        value = response.json()
+        for part in endpoint["field"].split("."):
+            value = value.get(part, "") if isinstance(value, dict) else ""
+        return value.strip() if isinstance(value, str) else ""
+
+    def answer(self, query):
+        """(answer, source) for a question, answer is None if no endpoint had one"""
+        key = self.normalize(query)
+        with self.lock:
+            self.stats["requests"] += 1
+        cached = self.cache.get(key)
+        if cached is not None:
+            with self.lock:
+                self.stats["cache_hits"] += 1
+            return cached["answer"], cached["source"]
+
+        start = time.perf_counter()
+        futures = [self.pool.submit(self.fetch, endpoint, key) for endpoint in self.endpoints]
+        deadline = time.monotonic() + self.timeout
+        answer, source, failed = None, None, False
+        for endpoint, future in zip(self.endpoints, futures):
+            try:
+                text = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except TimeoutError:
+                failed = True
+                continue
+            except Exception as e:
+                print(f"Web answer from {endpoint['name']} failed: {e}")
+                failed = True
+                continue
+            if text:
+                answer, source = text, endpoint["name"]
+                break
+        latency = (time.perf_counter() - start) * 1000
+
+        with self.lock:
+            self.stats["fetches"] += 1
+            self.stats["errors"] += failed
+            self.stats["answered"] += answer is not None
+            self.fetch_latencies.append(latency)
+        # "No answer" is only remembered when every endpoint actually said so
+        if answer is not None or not failed:
+            self.cache.put(key, answer, source)
+        return answer, source
+
+    def snapshot(self):
+        """Cache hit rate, fetch latency percentiles and counters as a plain dict"""
+        with self.lock:
+            stats = dict(self.stats)
+            latencies = list(self.fetch_latencies)
+        stats["cache_entries"] = len(self.cache)
+        stats["cache_hit_rate"] = round(stats["cache_hits"] / stats["requests"], 3) if stats["requests"] else 0.0
+        if latencies:
+            stats["fetch_p50_ms"] = round(percentile(latencies, 0.5), 1)
+            stats["fetch_p99_ms"] = round(percentile(latencies, 0.99), 1)
+        return stats
+
+    def close(self):
+        """Save the cache and release the connection pool"""
+        self.pool.shutdown(wait=False)
+        self.cache.save()
+        if self.session is not None:
+            self.session.close()